@@ -0,0 +1,94 @@
+'''
+approximate explored sets, a few bits per state
+
+to find out whether a huge search has any solution at all, or to get any one solution,
+we need not remember each state we have visited exactly.  a BitStateSet (bitstate
+hashing, or a Bloom filter when hashes > 1) keeps only a fixed array of bits: adding a
+state sets the bits at hashes positions worked out from its hash, and a state is taken
+to have been visited if all of its bits are set.  a state that was never visited can
+still find all its bits set by others (more often as the array fills up), and then the
+search wrongly skips it, and everything that only it leads to.  so the search may miss
+a solution, or a shorter one, but never returns a path that isn't one
+
+pass one to shortest_path_search as explored; the frontier then carries each state's
+path back to the start, since there are no parent pointers to rebuild it from:
+
+    explored = BitStateSet(bits=8 * 2**30)  # 1GB of bits
+    path = shortest_path_search(start, successors, is_goal, explored=explored)
+    explored.stats()  # => {'states': ..., 'false_positive_rate': ..., 'expected_misses': ...}
+'''
+
+MASK64 = 2**64 - 1
+
+class BitStateSet(object):
+    """a set of states, kept as bits bits with hashes bits set per state, that may
+    answer that a state is in it when it isn't (but never that a state isn't in it
+    when it is).  it counts the states added and estimates how many were missed."""
+
+    def __init__(self, bits=2**27, hashes=3):
+        self.bits = bits
+        self.hashes = hashes
+        self.array = bytearray((bits + 7) // 8)
+        self.states = 0  # number of states added
+        self.bits_set = 0
+        self.expected_misses = 0.0  # sum of the false positive rate at each add
+
+    def __len__(self):
+        return self.states
+
+    def positions(self, state):
+        """the bit positions for state (double hashing: h1 + i*h2).  h2 mixes the high
+        bits of hash(state) into the low ones: taken mod a power of 2, a tuple's hash
+        (and so hash((state, salt))) depends only on the low bits of its items' hashes."""
+        h1 = hash(state) & MASK64
+        h2 = ((h1 ^ (h1 >> 33)) * 0xff51afd7ed558ccd) & MASK64
+        h2 = (((h2 ^ (h2 >> 33)) * 0xc4ceb9fe1a85ec53) & MASK64) | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, state):
+        array = self.array
+        return all(array[p >> 3] & (1 << (p & 7)) for p in self.positions(state))
+
+    def add(self, state):
+        """set the bits for state.  a state the search adds is one it took to be new;
+        if it was new, it had this chance of being taken for an old one instead."""
+        self.expected_misses += self.false_positive_rate()
+        self.states += 1
+        array = self.array
+        for p in self.positions(state):
+            byte, bit = p >> 3, 1 << (p & 7)
+            if not array[byte] & bit:
+                array[byte] |= bit
+                self.bits_set += 1
+
+    def false_positive_rate(self):
+        "the chance that a state never added is taken to be in the set now."
+        return (float(self.bits_set) / self.bits) ** self.hashes
+
+    def stats(self):
+        """return a dict of the states added, the bits used, the false positive rate now,
+        and the expected number of new states that were taken for old ones.  states
+        that only a missed state leads to are lost too, and aren't counted in that."""
+        return {'states': self.states, 'bits': self.bits, 'hashes': self.hashes,
+                'bits_set': self.bits_set, 'bits_per_state': float(self.bits) / max(self.states, 1),
+                'false_positive_rate': self.false_positive_rate(),
+                'expected_misses': self.expected_misses}
+
+def test():
+    from shortest_path_search import shortest_path_search
+    from cannibals_missionaries import csuccessors
+    start, goal = (40, 20, 1, 0, 0, 0), (0, 0, 0, 40, 20, 1)
+    exact = shortest_path_search(start, csuccessors, lambda state: state == goal)
+    explored = BitStateSet(bits=2**20)
+    path = shortest_path_search(start, csuccessors, lambda state: state == goal, explored=explored)
+    assert path == exact
+    assert explored.stats()['expected_misses'] < 0.01
+    # far too few bits: states are missed, but what comes back is still a path
+    explored = BitStateSet(bits=2**10, hashes=1)
+    path = shortest_path_search(start, csuccessors, lambda state: state == goal, explored=explored)
+    assert explored.stats()['expected_misses'] > 1
+    assert all(csuccessors(path[i])[path[i+2]] == path[i+1] for i in range(0, len(path) - 2, 2))
+    return 'test passes'
+
+if __name__ == '__main__':
+    print test()
@@ -58,9 +58,10 @@ BONUS = WWF
 DW, TW, DL, TL = '23:;'   
 
 def removed(letters, remove):
-    "Return a str of letters, but with each letter in remove removed once."
+    """Return a str of letters, but with each letter in remove removed once.
+    A lowercase letter in remove was played with a blank, so it removes a '_'."""
     for L in remove:
-        letters = letters.replace(L, '', 1)
+        letters = letters.replace('_' if L.islower() else L, '', 1)
     return letters
 
 def prefixes(word):
@@ -96,9 +97,10 @@ def is_empty(sq):
 def add_suffixes(hand, pre, start, row, results, anchored=True):
     "Add all possible suffixes, and accumulate (start, word) pairs in results."
     i = start + len(pre)
-    if pre in WORDS and anchored and not is_letter(row[i]):
+    word = pre.upper()  # blanks are lowercase in pre
+    if word in WORDS and anchored and not is_letter(row[i]):
         results.add((start, pre))
-    if pre in PREFIXES:       
+    if word in PREFIXES:
         sq = row[i]
         if is_letter(sq):
             add_suffixes(hand, pre+sq, start, row, results)        
@@ -134,8 +136,9 @@ def find_prefixes(hand, pre='', results=None):
     if results is None: results = set()
     if pre == '': prev_hand, prev_results = hand, results
     # Now do the computation
-    if pre in WORDS or pre in PREFIXES: results.add(pre)
-    if pre in PREFIXES:
+    word = pre.upper()  # blanks are lowercase in pre
+    if word in WORDS or word in PREFIXES: results.add(pre)
+    if word in PREFIXES:
         for L in hand:
             if L is '_':  # CHANGES MADE HERE
                 for lwr in string.lowercase:
@@ -224,8 +227,9 @@ def cross_word_score(board, L, pos, direction):
   
 ACROSS, DOWN = (1, 0), (0, 1) # Directions that words can go
    
-def horizontal_plays(hand, board):
-    "Find all horizontal plays -- (score, pos, word) pairs -- across all rows."
+def horizontal_plays(hand, board, row_plays=row_plays):
+    """Find all horizontal plays -- (score, pos, word) pairs -- across all rows.
+    row_plays(hand, row) finds the (start, word) plays in a row."""
     results = set()
     for (j, row) in enumerate(board[1:-1], 1):
         set_anchors(row, j, board)
@@ -235,11 +239,11 @@ def horizontal_plays(hand, board):
     return results
 
 
-def all_plays(hand, board):
+def all_plays(hand, board, row_plays=row_plays):
     """All plays in both directions. A play is a (score, pos, dir, word) tuple,
     where pos is an (i, j) pair, and dir is a (delta-_i, delta_j) pair."""
-    hplays = horizontal_plays(hand, board)
-    vplays = horizontal_plays(hand, transpose(board))
+    hplays = horizontal_plays(hand, board, row_plays)
+    vplays = horizontal_plays(hand, transpose(board), row_plays)
     return (set((score, (i, j), ACROSS, w) for (score, (i, j), w) in hplays) |
             set((score, (i, j), DOWN, w) for (score, (j, i), w) in vplays))
  
@@ -1,31 +1,38 @@
 
 import doctest
+import heapq
+from itertools import count
+from lowest_cost_search import lowest_cost_search, astar_search, path_cost, all_optimal_paths, k_shortest_paths
+from lowest_cost_search import anytime_astar_search, anytime_paths
 
 # explored is our hash table of visited states
 # frontier is our min-heap of paths in process
-def bridge_problem(here):
+def bridge_problem(here, stats=None):
     here = frozenset(here) | frozenset(['light'])
     explored = set()  # set of states we have visited
+    successors, is_goal = bsuccessors, lambda (here1, there1, t1): not here1 or here1 == frozenset(['light'])
+    if stats is not None:  # a search_stats.SearchStats to count and time the search in
+        successors, is_goal = stats.watch(successors, is_goal)
     # state will be a (people-here, people-there, time-elapsed) tuple
-    frontier = [ [(here, frozenset(), 0)] ]  # ordered list of paths we have blazed
-    if not here:
-        return frontier[0]
+    # frontier entries are (elapsed-time, seq, path); seq keeps equal-time paths in insertion order
+    seq = count()
+    frontier = [ (0, next(seq), [(here, frozenset(), 0)]) ]  # min-heap of paths we have blazed
     while frontier:
-        path = frontier.pop(0)
-        state1 = here1, there1, t1 = path[-1]
+        path = heapq.heappop(frontier)[-1]
         # test for solution after path's pulled off heap, rather than before it's put into heap
-        if not here1 or here1 == frozenset(['light']):  # nobody left 'here'
-            return path
-        for (state, action) in bsuccessors(path[-1]).items():
+        if is_goal(path[-1]):  # nobody left 'here'
+            return stats.done(path) if stats else path
+        for (state, action) in successors(path[-1]).items():
             if state not in explored:
                 explored.add(state)
                 path2 = path + [action, state]
-                frontier.append(path2)
-                frontier.sort(key=elapsed_time)
-                # this sorting of frontier upon every insert effectively makes frontier a heap
-                # sorting is a bit wasteful, though; using a binary search and bisecting the list
-                # for an insert would be better
-    return []
+                heapq.heappush(frontier, (elapsed_time(path2), next(seq), path2))
+                # heappush is O(log n), where sorting the whole frontier on every insert was O(n log n)
+            elif stats is not None:
+                stats.duplicates += 1
+        if stats is not None:
+            stats.sizes(len(frontier), len(explored))
+    return stats.done([]) if stats else []
 
 def elapsed_time(path): return path[-1][2]
 
@@ -37,10 +44,10 @@ def bsuccessors(state):
     here, there, t = state
     if 'light' in here:
         return dict(((here - frozenset([a,b,'light']), there | frozenset([a,b,'light']), t+max(a,b)), (a,b,'->'))
-                    for a in here if a is not 'light' for b in here if b is not 'light')
+                    for a in here if a != 'light' for b in here if b != 'light')
     else:
         return dict(((here | frozenset([a,b,'light']), there - frozenset([a,b,'light']), t+max(a,b)), (a,b,'<-'))
-                    for a in there if a is not 'light' for b in there if b is not 'light')
+                    for a in there if a != 'light' for b in there if b != 'light')
 
 def path_states(path):
     "Return a list of states in this path."
@@ -84,18 +91,16 @@ True
 >>> path_actions(bridge_problem([4,4,4,4,4,4,4]))
 [(4, '->')]
 """
-# Testing is important! Try to get in the habit of doing it regularly.
-print doctest.testmod()
 
 def bsuccessors2(state):
     "returns a dict of {state: action} pairs.  a state is a (here, there) tuple."
     here, there = state
     if 'light' in here:
         return dict(((here - frozenset([a,b,'light']), there | frozenset([a,b,'light'])), (a,b,'->'))
-                    for a in here if a is not 'light' for b in here if b is not 'light')
+                    for a in here if a != 'light' for b in here if b != 'light')
     else:
         return dict(((here | frozenset([a,b,'light']), there - frozenset([a,b,'light'])), (a,b,'<-'))
-                    for a in there if a is not 'light' for b in there if b is not 'light')
+                    for a in there if a != 'light' for b in there if b != 'light')
 
 def bcost(action):
     """Returns the cost (a number) of an action in the
@@ -105,65 +110,256 @@ def bcost(action):
     a, b, arrow = action
     return max(a, b)
 
-def path_cost(path):
-    """The total cost of a path (which is stored in a tuple
-    with the final action)."""
-    # path = [state, (action, total_cost), state, ... ]
-    if len(path) < 3:
+def all_over(state):
+    "nobody (other than, possibly, the light) is left 'here'."
+    here, there = state
+    return not here or here == frozenset(['light'])
+
+def bdominance_key(state):
+    "the people here: only states with the same people on each side can dominate each other."
+    here, there = state
+    return here - frozenset(['light'])
+
+def bdominates(a, b):
+    """with the same people on each side, a state with the light here (where people are
+    still waiting for it) dominates one with the light over there: from there, someone
+    has to bring it back, and more people here never makes the rest of the way cheaper.
+    an example of lowest_cost_search's dominates hook, with bdominance_key."""
+    return 'light' in a[0] and 'light' not in b[0]
+
+def bridge_problem2(here, stats=None, successors=bsuccessors2):
+    """find the least-cost path across the bridge with lowest_cost_search.
+    a state is a (people-here, people-there) tuple; path costs are stored
+    with the actions: [state, (action, total_cost), state, ...]
+    successors may be a successor_cache.SuccessorCache of bsuccessors2 that
+    is kept across a batch of problems."""
+    here = frozenset(here) | frozenset(['light'])
+    # explored moves into lowest_cost_search: a state is explored when a path to it gets popped
+    # off the heap, not when we first encounter it, since only then do we know that path is the
+    # cheapest of all paths that go through the state
+    return lowest_cost_search((here, frozenset()), successors, all_over, bcost, stats=stats)
+
+def bheuristic(state):
+    """a lower bound on the time left to get everyone across from a (here, there) state.
+    with n people here and the light here, it takes at least n-1 trips forward and n-2
+    trips back (n forward and n back if the light is over there).  people here must all
+    go forward, at most two at a time, so the slowest ceil(n/2) forward trips take at
+    least the sum of every other time, slowest first; every other trip takes at least
+    the fastest time of anyone."""
+    here, there = state
+    people = sorted((p for p in here if p != 'light'), reverse=True)
+    n = len(people)
+    if not n:
         return 0
+    fastest = min(p for p in here | there if p != 'light')
+    if 'light' in here:
+        forward, back = max(n-1, 1), max(n-2, 0)
     else:
-        last_action, total_cost = path[-2]
-        return total_cost
-
-def final_state(path): return path[-1]
-
-def add_to_frontier(frontier, path):
-    "add path to frontier, replacing costlier path to same state if there is one."
-    # (this could be done more efficiently)
-    # determine whether there is an old path to the final state of this path
-    old = None
-    for i,p in enumerate(frontier):
-        if final_state(p) == final_state(path):
-            old = i
-            break
-    if old is not None and path_cost(frontier[old]) < path_cost(path):
-        return  # old path was better; do nothing
-    elif old is not None:
-        del frontier[old]  # old path was worse; delete it
-        frontier.append(path)  # append new, better path
-        frontier.sort(key=path_cost)
-
-def bridge_problem2(here):
+        forward, back = n, n
+    slowest = people[::2]
+    return sum(slowest) + (forward - len(slowest) + back) * fastest
+
+def bridge_problem3(here, heuristic=bheuristic, stats=None):
+    "find the least-cost path across the bridge with A* search, guided by heuristic."
     here = frozenset(here) | frozenset(['light'])
-    explored = set()  # set of states we have visited
-    # state will be a (people-here, people-there, time-elapsed) tuple
-    frontier = [ [(here, frozenset())] ]  # ordered list of paths we have blazed
-    if not here:
-        return frontier[0]
-    while frontier:
-        path = frontier.pop(0)
-        state1 = here1, there1 = final_state(path)
-        # test for solution after path's pulled off heap, rather than before it's put into heap
-        if not here1 or here1 == frozenset(['light']):  # nobody left 'here'
-            return path
-        explored.add(state1)  # moved this out of the for-loop to here
-        # the reason this was moved here and out of the for-loop is the same reason we moved
-        # the 'if not here' out of the for-loop to the above position: if a path that ends at
-        # state1 gets popped off the heap then we know it's the cheapest of all paths that go
-        # through state1, just as a path that ends in a solution that's popped off the heap is
-        # the cheapest path to the solution (all other paths that were cheaper when this path
-        # landed on state1 or the solution had a chance, thanks to moving this part of the program
-        # out of the for-loop, to get to state1 or the solution at a lower cost but, as we see now,
-        # manifestly didn't do that)
-        # moved it here because you don't want to say you've explored the state when you first
-        # encounter it in the for loop
-        pcost = path_cost(path)
-        for (state, action) in bsuccessors2(state1).items():
-            if state not in explored:
-                total_cost = bcost(action) + pcost
-                path2 = path + [(action, total_cost), state]
-                add_to_frontier(frontier, path2)  # keep least costly path that gets to state path2[-1]
-                # this sorting of frontier upon every insert effectively makes frontier a heap
-                # sorting is a bit wasteful, though; using a binary search and bisecting the list
-                # for an insert would be better
-    return []
+    return astar_search((here, frozenset()), bsuccessors2, all_over, bcost, heuristic, stats=stats)
+
+def bridge_problem_fast(here, verify=False):
+    """bridge_problem2's answer without a search, in O(n log n).  with everyone sorted
+    by time, a fastest, b next, y next to slowest and z slowest, the two slowest get
+    across at the least cost one of two ways: a and b cross, a brings the light back,
+    y and z cross, b brings it back (a + 2b + z); or a takes each of them across and
+    comes back (2a + y + z).  take the cheaper, and repeat until three or fewer are
+    left, who a takes across.  as in bridge_problem2, people are a set of times, so
+    people with the same time count once.  if verify, every move is checked against
+    bsuccessors2 and the cost against bridge_problem2's (a search, so only for small
+    groups), and a mismatch raises AssertionError."""
+    people = sorted(set(p for p in here if p != 'light'))
+    moves = []
+    while len(people) > 3:
+        a, b, y, z = people[0], people[1], people[-2], people[-1]
+        if 2*b <= a + y:
+            moves += [(a, b, '->'), (a, a, '<-'), (y, z, '->'), (b, b, '<-')]
+        else:
+            moves += [(a, z, '->'), (a, a, '<-'), (a, y, '->'), (a, a, '<-')]
+        del people[-2:]
+    if len(people) == 3:
+        moves += [(people[0], people[2], '->'), (people[0], people[0], '<-'),
+                  (people[0], people[1], '->')]
+    elif people:
+        moves.append((people[0], people[-1], '->'))
+    state = (frozenset(here) | frozenset(['light']), frozenset())
+    path, total_cost = [state], 0
+    for action in moves:
+        a, b, arrow = action
+        crossing = frozenset([a, b, 'light'])
+        here1, there1 = state
+        state = (here1 - crossing, there1 | crossing) if arrow == '->' else (here1 | crossing, there1 - crossing)
+        total_cost += bcost(action)
+        path += [(action, total_cost), state]
+    if verify:
+        for i in range(0, len(path) - 2, 2):
+            if path[i+2] not in bsuccessors2(path[i]):
+                raise AssertionError('%r is not a move from %r' % (path[i+1], path[i]))
+        if total_cost != path_cost(bridge_problem2(here)):
+            raise AssertionError('%d is not the least cost, %d' % (total_cost, path_cost(bridge_problem2(here))))
+    return path
+
+def bridge_problem_bits(here, stats=None):
+    """bridge_problem2 on a compact encoding of states.  person i (in sorted order of
+    time) is bit i of an int, and the light is bit n; a state is the int for the people
+    (and maybe light) here, since everyone else is there.  a crossing flips the bits of
+    one or two people and the light, so successors are found with bit operations over
+    masks computed once per problem.  the path comes back in bridge_problem2's form."""
+    people = sorted(set(p for p in here if p != 'light'))
+    path = bits_search(people, stats=stats)
+    return [bits_to_sides(x, people) if i % 2 == 0 else x for (i, x) in enumerate(path)]
+
+def bridge_problem_crowd(here, canonicalize=True, stats=None):
+    """bridge_problem_bits for a crowd in which several people may take the same time
+    to cross.  a frozenset can only hold one of them, so bridge_problem2 counts them
+    once; here each person gets a bit of their own.  people with the same time are
+    interchangeable, so unless canonicalize is False, states that differ only in which
+    of them are where are searched as one.  states come back as (here, there) pairs of
+    sorted tuples of times (and the 'light')."""
+    people = sorted(p for p in here if p != 'light')
+    path = bits_search(people, bits_canonicalizer(people) if canonicalize else None, stats)
+    return [bits_to_tuples(x, people) if i % 2 == 0 else x for (i, x) in enumerate(path)]
+
+def bits_search(people, canonicalize=None, stats=None):
+    "find the least-cost path over int states for bridge_problem_bits and bridge_problem_crowd."
+    n = len(people)
+    light = 1 << n
+    everyone = (1 << (n+1)) - 1
+    crossings = [((1 << i) | (1 << j) | light, people[i], people[j])
+                 for i in range(n) for j in range(i, n)]
+    forward = [(mask, (a, b, '->')) for (mask, a, b) in crossings]
+    back = [(mask, (a, b, '<-')) for (mask, a, b) in crossings]
+
+    def successors(here):
+        if here & light:
+            return dict((here ^ mask, action) for (mask, action) in forward if here & mask == mask)
+        there = everyone ^ here
+        return dict((here | mask, action) for (mask, action) in back if there & mask == mask)
+
+    return lowest_cost_search(everyone, successors, lambda here: not here & ~light, bcost,
+                              stats=stats, canonicalize=canonicalize)
+
+def bits_canonicalizer(people):
+    """return a function that maps an int state of bits_search to the state with the
+    same number of people of each time here, but with the lowest bits of each time set;
+    people (sorted by time) with the same time are on adjacent bits."""
+    groups = {}  # time -> (lowest bit, mask of the bits of people with that time)
+    for (i, p) in enumerate(people):
+        lo, mask = groups.get(p, (i, 0))
+        groups[p] = (lo, mask | 1 << i)
+    groups = [g for g in groups.values() if g[1] != 1 << g[0]]  # only groups of 2 or more
+    def canonicalize(here):
+        for (lo, mask) in groups:
+            count = bin(here & mask).count('1')
+            here = (here & ~mask) | (((1 << count) - 1) << lo)
+        return here
+    return canonicalize
+
+def bits_to_sides(here, people):
+    "decode an int state of bridge_problem_bits into a (here, there) pair of frozensets."
+    sides = (set(), set())
+    for (i, p) in enumerate(people + ['light']):
+        sides[not here >> i & 1].add(p)
+    return frozenset(sides[0]), frozenset(sides[1])
+
+def bits_to_tuples(here, people):
+    "decode an int state of bridge_problem_crowd into a (here, there) pair of tuples."
+    sides = ([], [])
+    for (i, p) in enumerate(people + ['light']):
+        sides[not here >> i & 1].append(p)
+    return tuple(sides[0]), tuple(sides[1])
+
+class TestBridge2: """
+>>> path_cost(bridge_problem2([1,2,5,10]))
+17
+
+>>> path_cost(bridge_problem2([1,2,5,10,15,20]))
+42
+
+>>> [path_cost(bridge_problem2([1,1,2,3,5,8,13,21][:N])) for N in range(8)]
+[0, 1, 1, 2, 6, 12, 19, 30]
+
+>>> [path_cost(bridge_problem3([1,1,2,3,5,8,13,21][:N])) for N in range(8)]
+[0, 1, 1, 2, 6, 12, 19, 30]
+
+>>> path_cost(bridge_problem3([1,2,4,8,16,32])) == path_cost(bridge_problem2([1,2,4,8,16,32]))
+True
+
+## all of the equally good solutions, then the next best ones
+>>> start = (frozenset([1,2,5,10,'light']), frozenset())
+>>> sorted([action for (action, cost) in path_actions(path)]
+...        for path in all_optimal_paths(start, bsuccessors2, all_over, bcost)) # doctest: +NORMALIZE_WHITESPACE
+[[(2, 1, '->'), (1, 1, '<-'), (5, 10, '->'), (2, 2, '<-'), (2, 1, '->')],
+ [(2, 1, '->'), (2, 2, '<-'), (5, 10, '->'), (1, 1, '<-'), (2, 1, '->')]]
+>>> [path_cost(path) for path in k_shortest_paths(start, bsuccessors2, all_over, bcost, 4)]
+[17, 17, 19, 19]
+
+## a frontier of buckets pops paths in the same order as a heap, so finds the same path
+>>> start = (frozenset([1,2,5,10,15,20,25,30,'light']), frozenset())
+>>> (lowest_cost_search(start, bsuccessors2, all_over, bcost, frontier='buckets') ==
+...  lowest_cost_search(start, bsuccessors2, all_over, bcost, frontier='heap'))
+True
+
+## and so does the default, 'auto', on a tiny instance (and past a cost too big for buckets)
+>>> start = (frozenset([1,2,'light']), frozenset())
+>>> (lowest_cost_search(start, bsuccessors2, all_over, bcost) ==
+...  lowest_cost_search(start, bsuccessors2, all_over, bcost, frontier='heap'))
+True
+>>> start = (frozenset([1,2,5,2000,'light']), frozenset())
+>>> (lowest_cost_search(start, bsuccessors2, all_over, bcost) ==
+...  lowest_cost_search(start, bsuccessors2, all_over, bcost, frontier='heap'))
+True
+
+>>> [path_cost(bridge_problem_bits([1,1,2,3,5,8,13,21][:N])) for N in range(8)]
+[0, 1, 1, 2, 6, 12, 19, 30]
+
+>>> path_states(bridge_problem_bits([1,2]))
+[(frozenset([1, 2, 'light']), frozenset([])), (frozenset([]), frozenset([1, 2, 'light']))]
+
+## out of budget: the cheapest path on the frontier, and a lower bound on the cost
+>>> start = (frozenset([1,2,5,10,'light']), frozenset())
+>>> path = lowest_cost_search(start, bsuccessors2, all_over, bcost, max_expansions=5)
+>>> path.complete, path.lower_bound, path_cost(path)
+(False, 4, 4)
+
+## anytime search: ever cheaper paths, each with a lower bound, until the cheapest
+>>> [(path_cost(path), getattr(path, 'lower_bound', None)) for path in
+...  anytime_paths(start, bsuccessors2, all_over, bcost, bheuristic, weight=5)]
+[(21, 15), (20, 15), (19, 15), (17, 17), (17, None)]
+>>> path = anytime_astar_search(start, bsuccessors2, all_over, bcost, bheuristic, weight=5,
+...                             max_expansions=10)
+>>> path.complete, path.lower_bound, path_cost(path)
+(True, 15, 20)
+
+## the two shuttle patterns give the cheapest path without a search
+>>> [path_cost(bridge_problem_fast([1,1,2,3,5,8,13,21][:N], verify=True)) for N in range(8)]
+[0, 1, 1, 2, 6, 12, 19, 30]
+>>> path_actions(bridge_problem_fast([1,2,5,10]))
+[((1, 2, '->'), 2), ((1, 1, '<-'), 3), ((5, 10, '->'), 13), ((2, 2, '<-'), 15), ((1, 2, '->'), 17)]
+>>> path_cost(bridge_problem_fast([1,2,4,8,16,32], verify=True))
+52
+>>> path_cost(bridge_problem_fast(range(1, 501)))
+63995
+
+## pruning dominated states never costs the cheapest path
+>>> [path_cost(lowest_cost_search((frozenset([1,1,2,3,5,8,13,21][:N] + ['light']), frozenset()),
+...                               bsuccessors2, all_over, bcost, dominates=bdominates,
+...                               dominance_key=bdominance_key)) for N in range(8)]
+[0, 1, 1, 2, 6, 12, 19, 30]
+
+## a crowd of people with equal times: each of them has to cross
+>>> path_cost(bridge_problem_crowd([4,4,4,4,4,4,4]))
+44
+>>> path_cost(bridge_problem_crowd([1,1,2,3,5,8,13,21])) == path_cost(bridge_problem_crowd([1,1,2,3,5,8,13,21], canonicalize=False))
+True
+"""
+
+# Testing is important! Try to get in the habit of doing it regularly.
+if __name__ == '__main__':
+    print doctest.testmod()
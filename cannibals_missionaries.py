@@ -1,4 +1,6 @@
 
+from shortest_path_search import shortest_path_search
+
 # Peter Norvig's awesome solution, refactored at the return line of csuccessors to not
 # allow negative numbers in successor states
 
@@ -11,9 +13,25 @@ def csuccessors(state):
 
     items = []  # is this general enough to be correct for the case when (B1 + B2 > 1)?
     if B1: items += [(sub(state,delta), a+'->') for delta,a in deltas.items()]
-    if B2: itmes += [(add(state,delta), '<-'+a) for delta,a in deltas.items()]
+    if B2: items += [(add(state,delta), '<-'+a) for delta,a in deltas.items()]
 
-    return dict([(state, action) for state,action items if all(n >= 0 for n in state)])  # no negative numbers in states
+    return dict([(state, action) for state,action in items if all(n >= 0 for n in state)])  # no negative numbers in states
+
+def lazy_csuccessors(state):
+    """csuccessors as a generator of (state, action) pairs, so that a search can stop
+    making them as soon as one of them is the goal"""
+    M1, C1, B1, M2, C2, B2 = state
+    if C1 > M1 > 0 or C2 > M2 > 0:
+        return
+    for delta, a in deltas.items():
+        if B1:
+            state2 = sub(state, delta)
+            if min(state2) >= 0:
+                yield state2, a+'->'
+        if B2:
+            state2 = add(state, delta)
+            if min(state2) >= 0:
+                yield state2, '<-'+a
 
 deltas = {(2, 0, 1,     -2,  0, -1): 'MM',
           (0, 2, 1,      0, -2, -1): 'CC',
@@ -21,6 +39,22 @@ deltas = {(2, 0, 1,     -2,  0, -1): 'MM',
           (1, 0, 1,     -1,  0, -1): 'M',
           (0, 1, 1,      0, -1, -1): 'C'}
 
+delta_moves = deltas.items()  # a fixed order for the deltas, for vector_csuccessors
+vector_actions = [a+'->' for delta,a in delta_moves] + ['<-'+a for delta,a in delta_moves]
+
+def vector_csuccessors(states):
+    """csuccessors for a whole (n, 6) numpy array of states at once (see vector_search):
+    returns the (n, 10, 6) array of states each action in vector_actions leads to,
+    and the (n, 10) boolean array of which of them are successors"""
+    import numpy as np
+    table = np.array([delta for delta,a in delta_moves], np.int64)
+    M1, C1, B1, M2, C2, B2 = states.T
+    dining = ((C1 > M1) & (M1 > 0)) | ((C2 > M2) & (M2 > 0))
+    next_states = np.concatenate([states[:, None, :] - table, states[:, None, :] + table], axis=1)
+    boats = np.repeat(np.column_stack([B1 > 0, B2 > 0]), len(table), axis=1)
+    valid = boats & ~dining[:, None] & (next_states >= 0).all(axis=2)  # no negative numbers in states
+    return next_states, valid
+
 def sub(state, delta):
     "add vectors state and delta"
     return tuple([current - delta for current,delta in zip(state, delta)])
@@ -31,28 +65,26 @@ def add(state, delta):
 
 Fail = []
 
-def mc_problem(start=(3,3,1,0,0,0), goal=None):
+def mc_problem(start=(3,3,1,0,0,0), goal=None, stats=None, successors=csuccessors):
     """solves the missionaries and cannibals problem
     state is 6 ints: (M1, C1, B1, M2, C2, B2) on the start (1) and other (2) sides
     find a path that goes from the initial state to the goal state (which, if not
     specified, is the state with no people or boats on the start side)
     note that this is a minimum-step solution, not a minimum-cost solution, so
-    it is more like the pouring-water problems than the bridge problem"""
+    it is more like the pouring-water problems than the bridge problem
+    stats, if given, is a search_stats.SearchStats to count and time the search in
+    successors may be lazy_csuccessors, which makes successors only as they are needed"""
+    if goal is None:
+        goal = (0,0,0) + start[:3]
+    return shortest_path_search(start, successors, lambda state: state == goal, stats=stats)
+
+def mc_problem_vector(start=(3,3,1,0,0,0), goal=None, stats=None):
+    """mc_problem, searching a whole layer of states at a time with numpy arrays
+    (see vector_search); for large numbers of missionaries and cannibals"""
+    from vector_search import vector_shortest_path_search
     if goal is None:
         goal = (0,0,0) + start[:3]
-    if start == goal:
-        return [start]
-    explored = set()  # set of states we have visited
-    frontier = [ [start] ]  # heap of paths we have blazed
-    while frontier:
-        path = frontier.pop(0)
-        s = path[-1]
-        for (state, action) in csuccessors(s).items():
-            if state not in explored:
-                explored.add(state)
-                path2 = path + [action, state]
-                if state == goal:
-                    return path2
-                else:
-                    frontier.append(path2)  # to the end of the frontier heap
-    return Fail
+    M, C, B = start[0] + start[3], start[1] + start[4], start[2] + start[5]
+    return vector_shortest_path_search(start, vector_csuccessors,
+                                       lambda states: (states == goal).all(axis=1),
+                                       (M, C, B, M, C, B), vector_actions, stats)
@@ -0,0 +1,168 @@
+'''
+checkpoints for long searches, so that a search that is killed can be resumed
+
+pass checkpoint=Checkpoint(directory) to shortest_path_search or lowest_cost_search
+(or astar_search), and every so often (every seconds seconds, every expansions
+expansions, or when the process gets one of signals) the search writes what it knows
+to directory.  if the search is killed, running it again with a Checkpoint on the same
+directory carries on from the last checkpoint, and finds the same path it would have
+found had it not been stopped.  a Checkpoint catches signals until it is closed, which a
+with statement does at the end:
+
+    with Checkpoint('mc.checkpoint', seconds=300) as checkpoint:
+        path = shortest_path_search(start, successors, is_goal, checkpoint=checkpoint)
+
+checkpoints are incremental.  what a search adds (parent pointers; or, for a lowest
+cost search, the states it explores, and each path it puts on the frontier, as a
+pointer to the path it extends) goes onto the end of a log, a pickled chunk per
+checkpoint holding just what was added since the last one.  the rest is a small header:
+for a lowest cost search, the ids of the paths still on the frontier; for a
+breadth-first search, only the length of the frontier, which is the last states added.
+it is written to a new file and renamed over the old one, so a search killed while
+writing a checkpoint resumes from the one before.  log chunks past the end the header
+records are left over from such a write, and are cut off
+'''
+
+import cPickle as pickle
+import os
+import signal
+import time
+
+class Checkpoint(object):
+    """the checkpoint files for one search in directory, and when to write the next."""
+
+    def __init__(self, directory, seconds=600, expansions=None,
+                 signals=(getattr(signal, 'SIGUSR1', None),)):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.seconds = seconds
+        self.expansions = expansions
+        self.requested = False  # set by a signal
+        self.last = time.time()
+        self.count = 0  # expansions since the last checkpoint
+        self.log_end = 0  # the end of the last chunk of the log a header refers to
+        self.saves = self.bytes_written = 0
+        self.old_handlers = {}
+        for signum in signals:
+            if signum is not None:
+                try:
+                    self.old_handlers[signum] = signal.signal(signum, self.request)
+                except ValueError:  # not the main thread
+                    pass
+
+    def request(self, signum=None, frame=None):
+        "ask for a checkpoint at the next expansion (the handler for signals)."
+        self.requested = True
+
+    def due(self):
+        "count one expansion; return True if a checkpoint should be written before it."
+        self.count += 1
+        return (self.requested or
+                (self.expansions is not None and self.count >= self.expansions) or
+                (self.seconds is not None and time.time() - self.last >= self.seconds))
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def save(self, kind, start, records, snapshot):
+        """append records (what kind of search from start has added since the last
+        checkpoint) to the log, then replace the header with one that holds snapshot."""
+        mode = 'r+b' if os.path.exists(self.path('log')) else 'w+b'
+        with open(self.path('log'), mode) as f:
+            f.seek(self.log_end)
+            f.truncate()
+            if records:
+                pickle.dump(records, f, pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+            self.bytes_written += f.tell() - self.log_end
+            self.log_end = f.tell()
+        with open(self.path('header.new'), 'wb') as f:
+            pickle.dump({'kind': kind, 'start': start, 'log_end': self.log_end,
+                         'snapshot': snapshot}, f, pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+            self.bytes_written += f.tell()
+        os.rename(self.path('header.new'), self.path('header'))
+        self.requested, self.last, self.count = False, time.time(), 0
+        self.saves += 1
+
+    def load(self, kind, start):
+        """return (records, snapshot) from the last checkpoint of a kind of search from
+        start, with records the log's chunks joined together; or None if there isn't one."""
+        if not os.path.exists(self.path('header')):
+            return None
+        with open(self.path('header'), 'rb') as f:
+            header = pickle.load(f)
+        if header['kind'] != kind or header['start'] != start:
+            raise ValueError('%s holds a checkpoint of %s from %r, not of %s from %r'
+                             % (self.directory, header['kind'], header['start'], kind, start))
+        records = []
+        with open(self.path('log'), 'rb') as f:
+            while f.tell() < header['log_end']:
+                records.extend(pickle.load(f))
+        self.log_end = header['log_end']
+        return records, header['snapshot']
+
+    def close(self):
+        "put back the signal handlers there were before."
+        for (signum, handler) in self.old_handlers.items():
+            signal.signal(signum, handler)
+        self.old_handlers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def test():
+    import shutil, tempfile
+    from shortest_path_search import shortest_path_search
+    from lowest_cost_search import lowest_cost_search
+    from cannibals_missionaries import csuccessors
+    from bridge_problem import bsuccessors2, all_over, bcost
+    class Killed(Exception): pass
+    def killed_after(n, successors):
+        "successors, but the search is killed on the nth call"
+        calls = [0]
+        def killable(state):
+            calls[0] += 1
+            if calls[0] == n:
+                raise Killed
+            return successors(state)
+        return killable
+    start, goal = (40, 20, 1, 0, 0, 0), (0, 0, 0, 40, 20, 1)
+    bridge = (frozenset([1, 2, 5, 10, 15, 20, 25, 'light']), frozenset())
+    searches = [  # (search(successors, checkpoint), successors, kill points, expected path)
+        (lambda successors, checkpoint: shortest_path_search(start, successors, lambda state: state == goal,
+                                                             checkpoint=checkpoint),
+         csuccessors, (300, 700), shortest_path_search(start, csuccessors, lambda state: state == goal)),
+        (lambda successors, checkpoint: lowest_cost_search(bridge, successors, all_over, bcost,
+                                                           checkpoint=checkpoint),
+         bsuccessors2, (80, 120), lowest_cost_search(bridge, bsuccessors2, all_over, bcost))]
+    for (search, successors, kills, expected) in searches:
+        directory = tempfile.mkdtemp()
+        try:
+            for n in kills:  # killed twice before it's let finish
+                with Checkpoint(directory, seconds=None, expansions=50) as checkpoint:
+                    try:
+                        search(killed_after(n, successors), checkpoint)
+                        assert False, 'should have been killed'
+                    except Killed:
+                        pass
+                assert checkpoint.saves > 0
+                # the header holds no paths or states: a count, or the ids of live paths
+                with open(checkpoint.path('header'), 'rb') as f:
+                    snapshot = pickle.load(f)['snapshot']
+                assert all(isinstance(n, int) for n in (snapshot if isinstance(snapshot, list) else [snapshot]))
+            with Checkpoint(directory, seconds=None, expansions=50) as checkpoint:
+                assert search(successors, checkpoint) == expected
+            assert signal.getsignal(signal.SIGUSR1) != checkpoint.request
+        finally:
+            shutil.rmtree(directory)
+    return 'test passes'
+
+if __name__ == '__main__':
+    print test()
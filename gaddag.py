@@ -0,0 +1,172 @@
+'''
+finding scrabble plays along the edges of a GADDAG
+
+row_plays in blank_tiles.py builds every prefix the hand can make for an anchor with
+nothing to its left, then extends each one to the right a letter at a time, building a
+new string at each step and looking it up in WORDS and PREFIXES.  a GADDAG (Gordon,
+"A Faster Scrabble Move Generation Algorithm", after Appel and Jacobson) holds each
+word once for each of its letters: for the k-th letter, the path
+word[k-1::-1] + SEP + word[k:] spells the word backwards from that letter to its start,
+then forwards from the letter after it to its end.  so a play can be found by starting
+on the anchor square, following edges for the letters placed to the left of it (board
+letters, or tiles from the hand), crossing SEP, and following edges for the letters to
+its right.  no prefix is ever built or looked up; a string is made only for each play
+found.  identical subtrees are shared, so the GADDAG is a DAG
+
+gaddag_row_plays(hand, row) returns the same plays as row_plays(hand, row), so
+
+    all_plays(hand, board, gaddag_row_plays) == all_plays(hand, board)
+'''
+
+import random
+import time
+from blank_tiles import WORDS, ANY, is_letter, is_empty, all_plays, make_play
+
+SEP = '>'  # between the backwards part of a word and the forwards part
+END = '$'  # in a node at which a word ends
+
+def make_gaddag(words):
+    """return the GADDAG of words, as nested dicts from a letter (or SEP) to the node it
+    leads to; a node with END in it ends a word.  identical subtrees are shared."""
+    root = {}
+    for word in words:
+        for k in range(1, len(word) + 1):
+            node = root
+            for L in word[k-1::-1] + SEP + word[k:]:
+                node = node.setdefault(L, {})
+            node[END] = True
+    return minimized(root, {})
+
+def minimized(node, registry):
+    """return a node the same as node, with its subtrees shared with any the same as
+    them; registry maps (letter, id(child)) items to the one node that has them."""
+    for L in node:
+        if L != END:
+            node[L] = minimized(node[L], registry)
+    return registry.setdefault(tuple(sorted((L, id(child)) for (L, child) in node.iteritems())),
+                               node)
+
+GADDAG = make_gaddag(WORDS)
+
+def gaddag_row_plays(hand, row, gaddag=GADDAG):
+    """Return the set of legal plays in row, (start, 'WORD') pairs, as row_plays does.
+    From each anchor, go left: through the letters on the board to its left, if there
+    are any, or else onto as many of the empty squares (that aren't anchors) to its left
+    as the hand can fill; then cross SEP and go right from the anchor.  gaddag is
+    the lexicon to look words up in."""
+    results = set()
+    rack = dict((L, hand.count(L)) for L in set(hand))
+    tiles = list(row)  # the letter on (or played on) each square
+    letter = map(is_letter, row)  # whether each square has a letter on it
+
+    def moves(node, possibilities):
+        """the (tile, letter, child) moves the hand can make from node onto a square
+        that takes possibilities: a blank is played as a lowercase letter."""
+        result = []
+        blank = rack.get('_')
+        for L in (node if blank else rack):  # blanks can follow any edge
+            if L in possibilities and L in node:
+                if rack.get(L):
+                    result.append((L, L, node[L]))
+                if blank:
+                    result.append(('_', L.lower(), node[L]))
+        return result
+
+    def go_right(node, p, start):
+        "the word so far is on squares start to p-1, and node is where it leads."
+        if END in node and not letter[p]:
+            results.add((start, ''.join(tiles[start:p])))
+        sq = row[p]
+        if letter[p]:
+            if sq in node:
+                go_right(node[sq], p + 1, start)
+        elif is_empty(sq):
+            for (tile, tiles[p], child) in moves(node, sq if isinstance(sq, set) else ANY):
+                rack[tile] -= 1
+                go_right(child, p + 1, start)
+                rack[tile] += 1
+
+    def go_left(node, p, i, leftmost):
+        """the word so far is on squares p to i (the anchor), backwards from node; it may
+        go on to the left as far as leftmost."""
+        if not letter[p-1] and SEP in node:
+            go_right(node[SEP], i + 1, p)
+        if p > leftmost:
+            if letter[p-1]:
+                if row[p-1] in node:
+                    go_left(node[row[p-1]], p - 1, i, leftmost)
+            else:
+                for (tile, tiles[p-1], child) in moves(node, ANY):
+                    rack[tile] -= 1
+                    go_left(child, p - 1, i, leftmost)
+                    rack[tile] += 1
+
+    for (i, sq) in enumerate(row[1:-1], 1):
+        if isinstance(sq, set):
+            s = i
+            while letter[s-1]: s -= 1
+            if s == i:  # no letters to the left: empty squares the hand may fill
+                while is_empty(row[s-1]) and not isinstance(row[s-1], set): s -= 1
+            for (tile, tiles[i], child) in moves(gaddag, sq):
+                rack[tile] -= 1
+                go_left(child, i, i, s)
+                rack[tile] += 1
+    return results
+
+TILES = ('A'*9 + 'B'*2 + 'C'*2 + 'D'*4 + 'E'*12 + 'F'*2 + 'G'*3 + 'H'*2 + 'I'*9 + 'J' + 'K' +
+         'L'*4 + 'M'*2 + 'N'*6 + 'O'*8 + 'P'*2 + 'Q' + 'R'*6 + 'S'*4 + 'T'*6 + 'U'*4 + 'V'*2 +
+         'W'*2 + 'X' + 'Y'*2 + 'Z' + '_'*2)
+
+def empty_board():
+    "Return an empty board the size of BONUS, with a '*' in the middle."
+    board = [list('|' * 17)] + [list('|' + '.' * 15 + '|') for _ in range(15)] + [list('|' * 17)]
+    board[8][8] = '*'
+    return board
+
+def full_board(moves=40, seed=42):
+    """Return a board filled by up to moves best plays (found with gaddag_row_plays)
+    from hands of 7 tiles drawn at random."""
+    rng = random.Random(seed)
+    board = empty_board()
+    for _ in range(moves):
+        plays = all_plays(''.join(rng.sample(TILES, 7)), board, gaddag_row_plays)
+        if plays:
+            board = make_play(max(plays), board)
+    return board
+
+def copy_board(board): return [row[:] for row in board]
+
+def compare_speed(boards=3, hands=10, seed=42):
+    """time all_plays with row_plays and with gaddag_row_plays, for random hands on
+    full boards, and return the plays per second of each.  the plays must be the same."""
+    rng = random.Random(seed)
+    plays, seconds = 0, {'row_plays': 0.0, 'gaddag_row_plays': 0.0}
+    for b in range(boards):
+        board = full_board(seed=seed + b)
+        for _ in range(hands):
+            hand = ''.join(rng.sample(TILES, 7))
+            t0 = time.time()
+            expected = all_plays(hand, copy_board(board))
+            t1 = time.time()
+            got = all_plays(hand, copy_board(board), gaddag_row_plays)
+            t2 = time.time()
+            assert got == expected, hand
+            plays += len(expected)
+            seconds['row_plays'] += t1 - t0
+            seconds['gaddag_row_plays'] += t2 - t1
+    return dict((name, plays / t) for (name, t) in seconds.items())
+
+def test():
+    from blank_tiles import a_board
+    for hand in ['ABCEHKN', '_BCEHKN', '__CEHKN', 'AEINRST', 'QUIZ', '', 'EEEE_']:
+        assert all_plays(hand, a_board(), gaddag_row_plays) == all_plays(hand, a_board())
+    rng = random.Random(1)
+    board = full_board(moves=8)
+    for _ in range(10):
+        hand = ''.join(rng.sample(TILES, 7))
+        assert all_plays(hand, copy_board(board), gaddag_row_plays) == all_plays(hand, copy_board(board))
+    return 'tests pass'
+
+if __name__ == '__main__':
+    print test()
+    print compare_speed()
@@ -30,8 +30,48 @@ and our solution's interface to them will be their signatures as well as the sta
 respectively, that they return
 
 our solution: lowest_cost_search(start, successors, goal, cost) -> path
+
+if we also know a heuristic: state -> number that never overestimates the cost of getting
+from state to a goal, then astar_search(start, successors, goal, cost, heuristic) -> path
+pops paths in order of path_cost(path) + heuristic(final_state(path)) instead, and so
+expands only the states that could still be on a cheaper path to a goal.  lowest_cost_search
+is the special case of a heuristic that is always 0
+
+both keep every state they reach in memory.  when there are too many states for that,
+ida_search(start, successors, goal, cost, heuristic) -> path searches depth-first under a
+bound on path_cost + heuristic, raising the bound and starting over until it finds a goal.
+it needs memory only for the path it is on (and an optional, bounded transposition table),
+and pays for that by expanding states again on each round
+
+when there is more than one good answer, all_optimal_paths generates every lowest cost
+path, and k_shortest_paths generates the k lowest cost paths, cheapest first.  both are
+generators that carry on from where the search left off, rather than starting over, each
+time the caller asks for another path
+
+when action costs are small non-negative integers (the bridge problem's crossing times,
+say), lowest_cost_search keeps its frontier in buckets, one for each cost, rather than
+in a heap (Dial's algorithm): adding a path is O(1), and popping one is O(1) amortized.
+it goes back to a heap if it meets a cost that doesn't fit; either way, it pops paths
+in the same order, and so returns the same path
+
+given a deadline or max_expansions, the searches stop when they run out and return a
+search_budget.Partial path with a lower bound on the cost of the best one.
+anytime_astar_search goes further: it runs A* with the heuristic weighted up, which
+finds some path to a goal quickly, then keeps searching for cheaper ones (and raising
+its lower bound) until it either proves its path is the cheapest or runs out of budget
+
+when some states can't lead anywhere better than others (the same position with less
+fuel, say), lowest_cost_search can be given a dominates(a, b) test, and a dominance_key
+that groups the states that may dominate each other; a path to a state that a cheaper
+one dominates is dropped before it gets on the frontier, and stats.pruned counts them
 '''
 
+import heapq
+from collections import defaultdict, deque
+from itertools import count, islice
+from search_budget import Partial, make_budget
+from shortest_path_search import successor_pairs
+
 def final_state(path): return path[-1]
 
 
@@ -43,46 +83,524 @@ def path_cost(path):
         return total_cost
 
 
+class Frontier(object):
+    """min-heap of paths ordered by key (path_cost by default), with an index from each path's
+    final state (or canonicalize(state), if canonicalize is given) to its heap entry.
+    entries are [cost, seq, state, path] lists; seq breaks ties in insertion order (as the
+    stable sort of the old list-based frontier did).  a costlier path to a state is replaced
+    by lazy deletion: its entry is marked removed and skipped when it reaches the top of the
+    heap, so push, pop and replace are all O(log n)."""
+
+    REMOVED = None  # placeholder for the path of a replaced entry
+
+    def __init__(self, paths=(), key=path_cost, canonicalize=None):
+        self.key = key
+        self.canonicalize = canonicalize
+        self.heap = []
+        self.index = {}  # state -> live [cost, seq, state, path] entry
+        self.seq = count()
+        for path in paths:
+            self.add(path)
+
+    def __len__(self): return len(self.index)
+
+    def __contains__(self, state): return state in self.index
+
+    def add(self, path):
+        """add path, replacing costlier path to same state if there is one.
+        return True if path was added."""
+        state, cost = final_state(path), self.key(path)
+        if self.canonicalize is not None:
+            state = self.canonicalize(state)
+        old = self.index.get(state)
+        if old is not None and old[0] < cost:
+            return False  # old path was better; do nothing
+        entry = [cost, next(self.seq), state, path]
+        self.push(entry)
+        if old is not None:
+            old[-1] = self.REMOVED  # old path was worse; retire its entry
+        self.index[state] = entry
+        return True
+
+    def push(self, entry):
+        "put a new entry in the heap."
+        heapq.heappush(self.heap, entry)
+
+    def pop(self):
+        "remove and return the least costly path."
+        while self.heap:
+            cost, seq, state, path = heapq.heappop(self.heap)
+            if path is not self.REMOVED:
+                del self.index[state]
+                return path
+        raise IndexError('pop from empty frontier')
+
+    def states(self):
+        "the final states (or canonicalize(state)s) of the live paths, in the order pop would return them."
+        return [entry[2] for entry in sorted(self.index.values())]
+
+
+class BucketFrontier(Frontier):
+    """Frontier for integer keys that are never less than the key of the last path popped,
+    nor more than bound greater (Dial's algorithm).  it keeps its entries in buckets, one
+    for each key in that window that has any, each a deque of entries in the order they
+    were added; a bucket is made when its first entry comes, and dropped when it is
+    emptied.  so push is O(1), pop is O(1) amortized (it may have to step past keys with
+    no bucket), and paths come out in the same order as from a Frontier.
+    a key that doesn't fit raises ValueError, unless fallback is true, in which case the
+    frontier moves its entries into a heap and carries on as a Frontier."""
+
+    def __init__(self, paths=(), key=path_cost, canonicalize=None, bound=1024, fallback=False):
+        self.buckets = {}  # key -> deque of entries; None once we fall back on the heap
+        self.bound = bound
+        self.cursor = None  # the key of the bucket pop looks in first
+        self.fallback = fallback
+        Frontier.__init__(self, paths, key, canonicalize)
+
+    def push(self, entry):
+        "put a new entry in the bucket for its key (or in the heap, once we have one)."
+        if self.buckets is None:
+            return Frontier.push(self, entry)
+        cost = entry[0]
+        if self.cursor is None:
+            self.cursor = cost
+        if (isinstance(cost, (int, long)) and
+                self.cursor <= cost <= self.cursor + self.bound):
+            bucket = self.buckets.get(cost)
+            if bucket is None:
+                bucket = self.buckets[cost] = deque()
+            bucket.append(entry)
+        elif self.fallback:
+            self.heap = [e for bucket in self.buckets.values() for e in bucket
+                         if e[-1] is not self.REMOVED]
+            heapq.heapify(self.heap)
+            self.buckets = None
+            Frontier.push(self, entry)
+        else:
+            raise ValueError('key %r is outside the buckets [%r, %r]'
+                             % (cost, self.cursor, self.cursor + self.bound))
+
+    def pop(self):
+        "remove and return the least costly path."
+        if self.buckets is None:
+            return Frontier.pop(self)
+        while self.index:
+            bucket = self.buckets.get(self.cursor)
+            while bucket:
+                cost, seq, state, path = bucket.popleft()
+                if path is not self.REMOVED:
+                    del self.index[state]
+                    return path
+            if bucket is not None:
+                del self.buckets[self.cursor]
+            self.cursor += 1
+        raise IndexError('pop from empty frontier')
+
+
 def add_to_frontier(frontier, path):
-    "add path to frontier, replacing costlier path to same state if there is one."
-    # (this could be done more efficiently)
-    # determine whether there is an old path to the final state of this path
-    old = None
-    for i,p in enumerate(frontier):
-        if final_state(p) == final_state(path):
-            old = i
-            break
-    if old is not None and path_cost(frontier[old]) < path_cost(path):
-        return  # old path was better; do nothing
-    elif old is not None:
-        del frontier[old]  # old path was worse; delete it
-        frontier.append(path)  # append new, better path
-        frontier.sort(key=path_cost)  # keep heap in sorted order (sorted by path_cost)
+    """add path to frontier, replacing costlier path to same state if there is one.
+    return True if path was added."""
+    return frontier.add(path)
 
 
-def lowest_cost_search(start, successors, is_goal, action_cost):
+def lowest_cost_search(start, successors, is_goal, action_cost, explored=None, stats=None,
+                       canonicalize=None, frontier='auto', deadline=None, max_expansions=None,
+                       checkpoint=None, dominates=None, dominance_key=None):
     """Return the lowest cost path, starting from start state,
     and considering successors(state) => {state:action,...},
     that ends in a state for which is_goal(state) is true,
     where the cost of a path is the sum of action costs,
-    which are given by action_cost(action)."""
+    which are given by action_cost(action).  explored, if given,
+    is an empty set-like container to keep the explored states in
+    (an out_of_core.DiskSet, for example).  stats, if given, is a
+    search_stats.SearchStats to count and time the search in.  canonicalize,
+    if given, maps each state to a representative of the states that are
+    the same as it up to symmetry; states with the same representative are
+    treated as one, though the path is made of the states actually reached.
+    frontier is 'heap' to keep the frontier in a heap, 'buckets' to keep it in
+    buckets (see BucketFrontier; action costs must then be integers from 0 to
+    1024), or 'auto' for buckets that fall back on a heap when a cost doesn't fit.
+    deadline (a time.time() value) and max_expansions, if given, bound the
+    search; if it runs out before it finds a goal, it returns a
+    search_budget.Partial: the cheapest path to a goal it has come across, if
+    any, or else the cheapest path on the frontier, with the cost of that
+    path as a lower bound on the cost of any path to a goal.  checkpoint, if
+    given, is a checkpoint.Checkpoint to save the search to now and then, and
+    to resume it from if it holds a checkpoint already.  dominates(a, b), if
+    given, is true if a path to state a that costs no more than a path to state b
+    makes b not worth going on from: a path to b is then dropped, before it gets
+    on the frontier, if a path to such an a that costs no more has been on it.
+    states are only tested against others with the same dominance_key(state), so
+    states that may dominate each other should share a key, and few others should;
+    dominates without a dominance_key raises ValueError, rather than testing each
+    state against every other."""
+    return astar_search(start, successors, is_goal, action_cost, None, explored, stats,
+                        canonicalize, frontier, deadline, max_expansions, checkpoint,
+                        dominates, dominance_key)
+
+
+def astar_search(start, successors, is_goal, action_cost, heuristic, explored=None, stats=None,
+                 canonicalize=None, frontier='heap', deadline=None, max_expansions=None,
+                 checkpoint=None, dominates=None, dominance_key=None):
+    """Like lowest_cost_search, but pop paths in order of their cost plus
+    heuristic(state), an estimate of the cost from their final state to a goal.
+    the path returned is still a lowest cost path so long as heuristic never
+    overestimates and never drops by more than an action's cost along a path.
+    the frontier is a heap by default, since cost plus heuristic is seldom an
+    integer in a narrow window.  if it runs out of budget, the lower bound of the
+    Partial it returns is the least cost plus heuristic on the frontier."""
+    if dominates is not None and dominance_key is None:
+        raise ValueError('dominates needs a dominance_key to index the states by')
+    if heuristic is None:
+        key = path_cost
+    else:
+        key = lambda path: path_cost(path) + heuristic(final_state(path))
     # no longer reflects knowledge of internal structure of states (e.g., start); it is therefore more general
-    explored = set()  # set of states we have visited
-    frontier = [ [start] ]  # heap of paths we have blazed (ordered by cost)
+    if explored is None:
+        explored = set()  # set of states we have visited
+    if stats is not None:
+        successors, is_goal = stats.watch(successors, is_goal)
+    # with a checkpoint, each path put on the frontier gets a node id, and is logged as a
+    # ('node', id, parent id, (action, total_cost), state) record; the header holds the
+    # ids of the live paths, in the order they are to be popped
+    saved = checkpoint.load('astar_search', start) if checkpoint is not None else None
+    if saved is None:
+        paths, ids, node_ids = [ [start] ], [0], count(1)
+        logged = [('node', 0, None, None, start)]  # records since the last checkpoint
+    else:
+        records, ids = saved
+        paths, explored_states, next_id = restore_paths(records, ids)
+        for state in explored_states:
+            explored.add(state)
+        node_ids, logged = count(next_id), []
+    node_of = {}  # (canonical) final state of each live path -> its node id
+    if frontier == 'heap':
+        frontier = Frontier([], key, canonicalize)  # heap of paths we have blazed (ordered by key)
+    else:
+        frontier = BucketFrontier([], key, canonicalize, fallback=(frontier == 'auto'))
+    for (path, n) in zip(paths, ids):  # in the order they are to be popped, so ties still break the same way
+        frontier.add(path)
+        node_of[final_state(path) if canonicalize is None else canonicalize(final_state(path))] = n
+    if dominates is not None:
+        seen = defaultdict(dict)  # dominance_key(state) -> {state: least cost put on the frontier}
+        for path in paths:
+            seen[dominance_key(final_state(path))][final_state(path)] = path_cost(path)
+    budget = make_budget(deadline, max_expansions)
+    best = None  # under a budget, the cheapest path to a goal put on the frontier so far
     while frontier:
-        path = frontier.pop(0)
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save('astar_search', start, logged, [node_of[s] for s in frontier.states()])
+            logged = []
+        if budget is not None and budget.spent():
+            path = frontier.pop()
+            if best is not None:
+                path = Partial(best, True, min(key(path), path_cost(best)))
+            else:
+                path = Partial(path, False, key(path))
+            return stats.done(path) if stats else path
+        path = frontier.pop()
         state1 = final_state(path)
         # test for solution after path's pulled off heap, rather than before it's put into heap
         if is_goal(state1):
-            return path
-        explored.add(state1)
+            return stats.done(path) if stats else path
+        explored.add(state1 if canonicalize is None else canonicalize(state1))
+        if checkpoint is not None:
+            parent = node_of.pop(state1 if canonicalize is None else canonicalize(state1))
+            logged.append(('explored', state1 if canonicalize is None else canonicalize(state1)))
         pcost = path_cost(path)
-        for (state, action) in successors(state1).items():
-            if state not in explored:
+        for (state, action) in successor_pairs(successors(state1)):
+            if (state if canonicalize is None else canonicalize(state)) not in explored:
                 total_cost = action_cost(action) + pcost
+                if dominates is not None:
+                    group = seen[dominance_key(state)]
+                    if any(cost <= total_cost and state2 != state and dominates(state2, state)
+                           for (state2, cost) in group.iteritems()):
+                        if stats is not None:
+                            stats.pruned += 1
+                        continue
                 path2 = path + [(action, total_cost), state]
-                add_to_frontier(frontier, path2)  # insert or keep least costly path that gets to state path2[-1]
-    return Fail
+                # insert or keep least costly path that gets to state path2[-1]
+                if not add_to_frontier(frontier, path2):
+                    if stats is not None:
+                        stats.duplicates += 1
+                    continue
+                if dominates is not None:
+                    group[state] = total_cost
+                if checkpoint is not None:
+                    n = next(node_ids)
+                    node_of[state if canonicalize is None else canonicalize(state)] = n
+                    logged.append(('node', n, parent, path2[-2], state))
+                if budget is not None and is_goal(state) and (
+                        best is None or total_cost < path_cost(best)):
+                    best = path2
+            elif stats is not None:
+                stats.duplicates += 1
+        if stats is not None:
+            stats.sizes(len(frontier), len(explored))
+    return stats.done(Fail) if stats else Fail
 
 
+def restore_paths(records, ids):
+    """rebuild the paths with node ids ids from the records of astar_search's checkpoint
+    log; return them, the states the log says were explored, and the next node id."""
+    nodes, explored = {}, []
+    for record in records:
+        if record[0] == 'node':
+            nodes[record[1]] = record[2:]
+        else:
+            explored.append(record[1])
+    paths = []
+    for n in ids:
+        path = []
+        while n is not None:
+            n, step, state = nodes[n]
+            path.append(state)
+            if step is not None:
+                path.append(step)
+        path.reverse()
+        paths.append(path)
+    return paths, explored, max(nodes) + 1
+
+
+def anytime_astar_search(start, successors, is_goal, action_cost, heuristic, weight=2,
+                         deadline=None, max_expansions=None, stats=None):
+    """Anytime weighted A*: return the last path anytime_paths generates before it
+    runs out of budget.  that is the cheapest path to a goal, if the search had
+    time to prove it; otherwise a search_budget.Partial, which is the cheapest path
+    to a goal found (or, if none was, the most promising path on the frontier),
+    along with a lower bound on the cost of the cheapest."""
+    path = Fail
+    for path in anytime_paths(start, successors, is_goal, action_cost, heuristic, weight,
+                              deadline, max_expansions, stats):
+        pass
+    return stats.done(path) if stats else path
+
+
+def anytime_paths(start, successors, is_goal, action_cost, heuristic, weight=2,
+                  deadline=None, max_expansions=None, stats=None):
+    """Generate ever cheaper paths to a goal.  this is A* with the heuristic
+    multiplied by weight, which heads straight for a goal but may find a costly
+    path first; it carries on past each goal it finds, skipping any path whose
+    cost plus heuristic is no less than the cheapest path to a goal so far, and
+    going back to a state it has expanded when it finds a cheaper path to it.
+    each path to a goal is generated as a search_budget.Partial, with the least
+    cost plus heuristic on the frontier as its lower bound; once the frontier is
+    empty, the last of them is the cheapest, and is generated again as a plain
+    path.  if the budget runs out first, the generator stops (with a Partial of
+    the most promising path on the frontier, if it never reached a goal)."""
+    if heuristic is None:
+        heuristic = lambda state: 0
+    if stats is not None:
+        successors, is_goal = stats.watch(successors, is_goal)
+    f = lambda path: path_cost(path) + heuristic(final_state(path))
+    frontier = Frontier([ [start] ], lambda path: path_cost(path) + weight * heuristic(final_state(path)))
+    best_cost = {start: 0}  # state -> lowest cost reached, whether expanded or on the frontier
+    budget = make_budget(deadline, max_expansions)
+    best = None  # the cheapest path to a goal so far
+    def lower_bound():
+        return min([f(entry[-1]) for entry in frontier.index.values()] +
+                   [path_cost(best) if best is not None else Infinity])
+    while frontier:
+        if budget is not None and budget.spent():
+            if best is None:
+                path = frontier.pop()
+                yield Partial(path, False, min(f(path), lower_bound()))
+            return
+        path = frontier.pop()
+        state1, pcost = final_state(path), path_cost(path)
+        if best is not None and f(path) >= path_cost(best):
+            continue
+        if is_goal(state1):
+            best = path
+            yield Partial(best, True, lower_bound())
+            continue
+        for (state, action) in successor_pairs(successors(state1)):
+            total_cost = pcost + action_cost(action)
+            if total_cost >= best_cost.get(state, Infinity):
+                if stats is not None:
+                    stats.duplicates += 1
+                continue
+            if best is not None and total_cost + heuristic(state) >= path_cost(best):
+                continue
+            best_cost[state] = total_cost
+            frontier.add(path + [(action, total_cost), state])
+        if stats is not None:
+            stats.sizes(len(frontier), len(best_cost))
+    if best is not None:
+        yield best
+
+
+def ida_search(start, successors, is_goal, action_cost, heuristic, table_size=0, stats=None):
+    """Iterative-deepening A*: search depth-first for a goal along paths whose cost
+    plus heuristic stays within a bound, starting with the bound at heuristic(start)
+    and raising it, each round, to the least cost that went over it.  returns the
+    same lowest cost path as astar_search.  if table_size > 0, up to that many states
+    are remembered each round with the lowest cost they were reached at, so that a
+    state reached again at no lower cost is not searched again.  stats, if given,
+    is a search_stats.SearchStats to count and time the search in (its frontier is
+    the path, and its explored set the transposition table)."""
+    if heuristic is None:
+        heuristic = lambda state: 0
+    if stats is not None:
+        successors, is_goal = stats.watch(successors, is_goal)
+    path = [start]
+    on_path = set([start])  # states on path; no path goes through a state twice
+    table = {}  # transposition table: state -> lowest cost reached at this round
+
+    def contour(state, g, bound):
+        """search below state (the end of path, reached at cost g) within bound;
+        return FOUND, or the least cost plus heuristic that went over bound."""
+        f = g + heuristic(state)
+        if f > bound:
+            return f
+        if is_goal(state):
+            return FOUND
+        least = Infinity
+        for (state2, action) in successor_pairs(successors(state)):
+            if state2 in on_path:
+                continue
+            g2 = g + action_cost(action)
+            if table.get(state2, Infinity) <= g2:
+                continue  # already searched from state2 this round, at a cost no higher
+            if state2 in table or len(table) < table_size:
+                table[state2] = g2
+            path.extend([(action, g2), state2])
+            on_path.add(state2)
+            if stats is not None:
+                stats.sizes(len(on_path), len(table))
+            t = contour(state2, g2, bound)
+            if t is FOUND:
+                return FOUND
+            del path[-2:]
+            on_path.discard(state2)
+            least = min(least, t)
+        return least
+
+    bound = heuristic(start)
+    while bound < Infinity:
+        table.clear()
+        bound = contour(start, 0, bound)
+        if bound is FOUND:
+            return stats.done(path) if stats else path
+    return stats.done(Fail) if stats else Fail
+
+
+def all_optimal_paths(start, successors, is_goal, action_cost):
+    """Generate every lowest cost path from start to a goal (every action must cost
+    more than 0).  this is lowest_cost_search, except that it keeps, for each state,
+    every previous state that reaches it at its lowest cost; it stops once the states
+    at the lowest cost of a goal have all been expanded, and then follows those
+    pointers back from each goal found to generate the paths, one at a time."""
+    best = {start: 0}  # state -> lowest cost found so far
+    parents = {start: []}  # state -> [(previous state, action), ...] reaching it at that cost
+    seq = count()
+    frontier = [(0, next(seq), start)]  # heap of (cost, seq, state); stale entries are skipped
+    explored, goals, goal_cost = set(), [], None
+    while frontier:
+        cost, _, state1 = heapq.heappop(frontier)
+        if state1 in explored or cost > best[state1]:
+            continue
+        if goal_cost is not None and cost > goal_cost:
+            break
+        explored.add(state1)
+        if is_goal(state1):
+            goal_cost = cost
+            goals.append(state1)
+            continue
+        for (state, action) in successor_pairs(successors(state1)):
+            total_cost = cost + action_cost(action)
+            if total_cost < best.get(state, Infinity):
+                best[state], parents[state] = total_cost, [(state1, action)]
+                heapq.heappush(frontier, (total_cost, next(seq), state))
+            elif total_cost == best[state]:
+                parents[state].append((state1, action))
+    for goal in goals:
+        for path in paths_to(goal, parents, best):
+            yield path
+
+def paths_to(state, parents, best):
+    "Generate each path to state that follows the parent pointers back to the start."
+    if not parents[state]:
+        yield [state]
+    for (state1, action) in parents[state]:
+        for path in paths_to(state1, parents, best):
+            yield path + [(action, best[state]), state]
+
+def k_shortest_paths(start, successors, is_goal, action_cost, k):
+    """Generate the k lowest cost paths from start to a goal, in order of cost.
+    these are walks: a path may come back to a state it has been in before (if
+    every action costs more than 0, such a path costs more than the path that
+    skips the loop).  the search pops paths in order of cost, as lowest_cost_search
+    does, but a state is expanded up to k times rather than once, since each of
+    the k best paths can reach it by a different one of its k best paths."""
+    return islice(kbest_paths(start, successors, is_goal, action_cost, k), k)
+
+def kbest_paths(start, successors, is_goal, action_cost, k):
+    "Generate paths to a goal in order of cost, expanding each state up to k times."
+    pops = defaultdict(int)  # state -> number of paths to it popped so far
+    seq = count()
+    frontier = [(0, next(seq), [start])]  # heap of (cost, seq, path)
+    while frontier:
+        cost, _, path = heapq.heappop(frontier)
+        state1 = final_state(path)
+        if pops[state1] >= k:
+            continue
+        pops[state1] += 1
+        if is_goal(state1):
+            yield path
+            continue
+        for (state, action) in successor_pairs(successors(state1)):
+            if pops[state] < k:
+                total_cost = cost + action_cost(action)
+                heapq.heappush(frontier, (total_cost, next(seq), path + [(action, total_cost), state]))
+
+
+FOUND = 'FOUND'  # contour's signal that path now ends in a goal
+Infinity = float('inf')
 Fail = []
+
+
+def test():
+    from search_stats import SearchStats
+    # walking along a line, refuelling at every third step: a state is (position, fuel),
+    # and more fuel at the same position dominates less
+    def fuel_successors(state):
+        x, fuel = state
+        result = {}
+        if fuel:
+            result[(x + 1, fuel - 1)] = 'walk'
+        if x % 3 == 0:
+            result[(x, min(fuel + 2, 6))] = 'refuel'
+        return result
+    fuel_cost = lambda action: 1 if action == 'walk' else 2
+    at_20 = lambda state: state[0] == 20
+    plain, pruned = SearchStats(), SearchStats()
+    path = lowest_cost_search((0, 0), fuel_successors, at_20, fuel_cost, stats=plain)
+    path2 = lowest_cost_search((0, 0), fuel_successors, at_20, fuel_cost, stats=pruned,
+                               dominates=lambda a, b: a[1] >= b[1],
+                               dominance_key=lambda state: state[0])
+    assert path_cost(path2) == path_cost(path) == 40
+    assert pruned.pruned > 0 and pruned.pruning_rate > 0 and plain.pruned == 0
+    assert pruned.expanded < plain.expanded
+    try:
+        lowest_cost_search((0, 0), fuel_successors, at_20, fuel_cost, dominates=lambda a, b: True)
+        assert False, 'dominates without a dominance_key should raise'
+    except ValueError:
+        pass
+    # ida_search finds paths as cheap as astar_search's, with and without a table
+    from bridge_problem import bsuccessors2, all_over, bcost, bheuristic
+    from parking_lot_search import psuccessors, blocking_cars, is_goal as parked, puzzle1, puzzle2
+    problems = [((frozenset(here), frozenset()), bsuccessors2, all_over, bcost, bheuristic)
+                for here in ([1, 2, 5, 10, 'light'], [1, 2, 5, 10, 15, 20, 'light'])]
+    problems += [(puzzle, psuccessors, parked, lambda action: 1, blocking_cars)
+                 for puzzle in (puzzle1, puzzle2)]
+    for (start, successors, is_goal, action_cost, heuristic) in problems:
+        cost = path_cost(astar_search(start, successors, is_goal, action_cost, heuristic))
+        for table_size in (0, 1000):
+            path = ida_search(start, successors, is_goal, action_cost, heuristic, table_size=table_size)
+            assert path[0] == start and is_goal(path[-1]) and path_cost(path) == cost
+    return 'tests pass'
+
+
+if __name__ == '__main__':
+    print test()
@@ -0,0 +1,207 @@
+'''
+explored sets for searches that outgrow memory
+
+a search keeps every state it has visited (in shortest_path_search, along with its
+parent pointer), and on a big enough problem that alone runs the process out of memory.
+DiskDict and DiskSet keep at most ram_budget states in an ordinary dict or set; when
+that fills up, its states are spilled to local disk and the dict starts again empty.
+
+on disk, each spilled (state, value) pair is pickled onto the end of a records file,
+and an open-addressing hash table, memory-mapped from a second file, maps hash(state)
+to the offset of its record.  a lookup that misses in memory probes the table and reads
+back only the records whose hash matches, so most misses touch no records at all.
+the table doubles (and its slots are rehashed) when it gets half full
+
+both count the states they spilled and the bytes of I/O they did.  their files are
+deleted by close(), which a with statement calls at the end:
+
+    with DiskDict(ram_budget=10**6) as parents:
+        path = shortest_path_search(start, successors, is_goal, parents)
+        parents.stats()  # => {'spilled': ..., 'bytes_written': ..., 'bytes_read': ..., ...}
+'''
+
+import cPickle as pickle
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+class DiskDict(object):
+    """a dict of state -> value holding at most ram_budget items in memory, and the
+    rest in files under a fresh temporary directory in directory (or the system's
+    temporary directory).  a value is written once: setting a state's value again
+    after it was spilled writes a new record, and the old one is never reclaimed."""
+
+    SLOT = struct.Struct('qq')  # (hash, record offset + 1); 0 marks an empty slot
+    LENGTH = struct.Struct('I')  # length prefix of each pickled record
+
+    def __init__(self, ram_budget=10**6, directory=None):
+        self.ram_budget = ram_budget
+        self.ram = {}
+        self.dir = tempfile.mkdtemp(prefix='search-', dir=directory)
+        self.records = open(os.path.join(self.dir, 'records'), 'w+b')
+        self.end = 0  # size of the records file
+        self.on_disk = 0  # number of states in the table
+        self.ram_on_disk = 0  # number of states in ram that are in the table too
+        self.capacity = 0
+        self.table = None
+        self.spilled = self.bytes_written = self.bytes_read = self.disk_lookups = 0
+        self.grow(1024)
+
+    def __len__(self):
+        return len(self.ram) + self.on_disk - self.ram_on_disk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, state):
+        return state in self.ram or self.find(state)[1] is not None
+
+    def __getitem__(self, state):
+        if state in self.ram:
+            return self.ram[state]
+        slot, record = self.find(state)
+        if record is None:
+            raise KeyError(state)
+        return record[1]
+
+    def __setitem__(self, state, value):
+        if self.on_disk and state not in self.ram and self.find(state)[1] is not None:
+            self.ram_on_disk += 1
+        self.ram[state] = value
+        if len(self.ram) >= self.ram_budget:
+            self.spill()
+
+    def get(self, state, default=None):
+        try:
+            return self[state]
+        except KeyError:
+            return default
+
+    def stats(self):
+        "return a dict of how many states were spilled to disk, and how much I/O that took."
+        return {'spilled': self.spilled, 'bytes_written': self.bytes_written,
+                'bytes_read': self.bytes_read, 'disk_lookups': self.disk_lookups,
+                'in_memory': len(self.ram)}
+
+    def close(self):
+        "release the files, and delete them."
+        if self.table is not None:
+            self.table.close()
+            self.table = None
+            self.records.close()
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+    def spill(self):
+        "write every state held in memory out to disk, and empty the in-memory dict."
+        for (state, value) in self.ram.iteritems():
+            data = pickle.dumps((state, value), pickle.HIGHEST_PROTOCOL)
+            self.records.seek(self.end)
+            self.records.write(self.LENGTH.pack(len(data)))
+            self.records.write(data)
+            offset, self.end = self.end, self.end + self.LENGTH.size + len(data)
+            self.bytes_written += self.LENGTH.size + len(data)
+            slot, record = self.find(state)
+            if record is None:
+                self.on_disk += 1
+            self.SLOT.pack_into(self.table, slot * self.SLOT.size, hash(state), offset + 1)
+            self.spilled += 1
+            if self.on_disk * 2 > self.capacity:
+                self.grow(self.capacity * 2)
+        self.records.flush()
+        self.ram = {}
+        self.ram_on_disk = 0
+
+    def find(self, state):
+        """probe the table for state; return (slot, (state, value)) if it is on disk,
+        else (the empty slot where it would go, None)."""
+        h = hash(state)
+        mask = self.capacity - 1
+        slot = h & mask
+        self.disk_lookups += 1
+        while True:
+            h2, offset = self.SLOT.unpack_from(self.table, slot * self.SLOT.size)
+            if not offset:
+                return slot, None
+            if h2 == h:
+                record = self.read(offset - 1)
+                if record[0] == state:
+                    return slot, record
+            slot = (slot + 1) & mask
+
+    def read(self, offset):
+        "read back the (state, value) record at offset in the records file."
+        self.records.seek(offset)
+        (length,) = self.LENGTH.unpack(self.records.read(self.LENGTH.size))
+        self.bytes_read += self.LENGTH.size + length
+        return pickle.loads(self.records.read(length))
+
+    def grow(self, capacity):
+        "move the table to a new file with room for capacity slots."
+        old, old_capacity = self.table, self.capacity
+        name = os.path.join(self.dir, 'table-%d' % capacity)
+        with open(name, 'w+b') as f:
+            f.truncate(capacity * self.SLOT.size)
+            self.table = mmap.mmap(f.fileno(), capacity * self.SLOT.size)
+        self.capacity = capacity
+        mask = capacity - 1
+        for i in xrange(old_capacity):
+            h, offset = self.SLOT.unpack_from(old, i * self.SLOT.size)
+            if offset:
+                slot = h & mask
+                while self.SLOT.unpack_from(self.table, slot * self.SLOT.size)[1]:
+                    slot = (slot + 1) & mask
+                self.SLOT.pack_into(self.table, slot * self.SLOT.size, h, offset)
+        if old is not None:
+            old.close()
+            os.remove(os.path.join(self.dir, 'table-%d' % old_capacity))
+        self.bytes_written += capacity * self.SLOT.size
+
+class DiskSet(DiskDict):
+    "a set of states holding at most ram_budget of them in memory, and the rest on disk."
+
+    def add(self, state):
+        self[state] = True
+
+def test():
+    from shortest_path_search import shortest_path_search
+    from lowest_cost_search import lowest_cost_search
+    from cannibals_missionaries import csuccessors
+    from bridge_problem import bsuccessors2, all_over, bcost
+    with DiskDict(ram_budget=10) as d:
+        for i in range(2000):  # spills every 10, and the table grows from 1024 slots
+            d[i] = i * i
+        assert d.capacity > 1024 and d.stats()['spilled'] == 2000 and len(d) == 2000
+        assert all(d[i] == i * i for i in range(0, 2000, 7)) and 2000 not in d
+        for i in range(3):  # set again after they were spilled: still counted once
+            d[i] = -i
+        assert len(d) == 2003 - 3 and [d[i] for i in range(3)] == [0, -1, -2]
+        d.spill()
+        assert len(d) == 2000 and [d[i] for i in range(3)] == [0, -1, -2]
+    assert not os.path.exists(d.dir)
+    # k and k + 2**64 - 1 have the same hash, so each pair lands in the same slot,
+    # and only reading back the records tells them apart
+    colliding = [k + m * (2**64 - 1) for k in range(1, 30) for m in range(3)]
+    with DiskSet(ram_budget=4) as s:
+        for state in colliding:
+            s.add(state)
+        assert len(s) == len(colliding) and all(state in s for state in colliding)
+        assert 30 + 2**64 - 1 not in s and 3 * (2**64 - 1) + 1 not in s
+    start, goal = (40, 20, 1, 0, 0, 0), (0, 0, 0, 40, 20, 1)
+    with DiskDict(ram_budget=50) as parents:
+        assert (shortest_path_search(start, csuccessors, lambda state: state == goal, parents) ==
+                shortest_path_search(start, csuccessors, lambda state: state == goal))
+        assert parents.stats()['spilled'] > 0
+    bridge = (frozenset([1, 2, 5, 10, 15, 20, 'light']), frozenset())
+    with DiskSet(ram_budget=50) as explored:
+        assert (lowest_cost_search(bridge, bsuccessors2, all_over, bcost, explored) ==
+                lowest_cost_search(bridge, bsuccessors2, all_over, bcost))
+        assert explored.stats()['spilled'] > 0
+    return 'tests pass'
+
+if __name__ == '__main__':
+    print test()
@@ -122,18 +122,133 @@ on whether ** is oriented up-down or left-right)
 
 N = 8
 
-def solve_parking_puzzle(start, N=N):
+def solve_parking_puzzle(start, N=N, heuristic=None, search=None, stats=None):
     """Solve the puzzle described by the starting position (a tuple 
     of (object, locations) pairs).  Return a path of [state, action, ...]
     alternating items; an action is a pair (object, distance_moved),
-    such as ('B', 16) to move 'B' two squares down on the N=8 grid."""
-    
+    such as ('B', 16) to move 'B' two squares down on the N=8 grid.
+    if a heuristic(state) is given, solve with A* search instead of
+    breadth-first search; the path is still a shortest one so long as the
+    heuristic never overestimates the number of moves left.  search may be
+    ida_search (or any search with the same signature as astar_search); for
+    big lots, ida_search needs memory only for the path it is on.  stats, if
+    given, is a search_stats.SearchStats to count and time the search in."""
+    successors = lambda state: psuccessors(state, N)
+    if heuristic is None and search is None:
+        return shortest_path_search(start, successors, is_goal, stats=stats)
+    h = (lambda state: 0) if heuristic is None else (lambda state: heuristic(state, N))
+    path = (search or astar_search)(start, successors, is_goal, lambda action: 1, h, stats=stats)
+    # astar_search stores (action, total_cost) pairs; keep just the actions
+    return [x if i % 2 == 0 else x[0] for i, x in enumerate(path)]
+
+def is_goal(state):
+    "the '*' car overlaps a goal square."
+    d = dict(state)
+    return bool(set(d['*']) & set(d['@']))
+
+def psuccessors(state, N=N):
+    """return a dict of {state: action} pairs.  a car can slide any number of
+    squares along the direction it points, until it bumps into a car or wall."""
+    results = {}
+    occupied = set(s for (c, squares) in state for s in squares if c != '@')
+    for (c, squares) in state:
+        if c not in '|@':
+            delta = 1 if squares[1] - squares[0] == 1 else N
+            for d in (delta, -delta):
+                end = squares[-1] if d > 0 else squares[0]
+                for i in range(1, N-2):
+                    if end + d*i in occupied:
+                        break
+                    results[update(state, c, tuple(s + d*i for s in squares))] = (c, d*i)
+    return results
+
+def update(state, car, squares):
+    "return a copy of state with car moved to squares."
+    return tuple((c, squares if c == car else sqs) for (c, sqs) in state)
+
+def blocking_cars(state, N=N):
+    """a lower bound on the moves left: every car between the '*' car and the
+    goal must move out of the way, and then '*' itself must move."""
+    d = dict(state)
+    car, goal = d['*'], d['@'][0]
+    if goal in car:
+        return 0
+    delta = 1 if car[1] - car[0] == 1 else N
+    if goal < car[0]:
+        delta, end = -delta, car[0]
+    else:
+        end = car[-1]
+    if (goal - end) % delta:
+        return 1  # the goal is not in line with '*'
+    between = set(range(end + delta, goal + delta, delta))
+    return 1 + len(set(c for (c, squares) in state
+                       if c not in '|@' and between.intersection(squares)))
+
 # But it would also be nice to have a simpler format to describe puzzles,
 # and a way to visualize states.
 # You will do that by defining the following two functions:
 
+def solve_parking_puzzle_bits(start, N=N, stats=None):
+    """solve_parking_puzzle on bitboards: square i of the grid is bit i of an int.
+    the walls are one fixed mask, and a state is a tuple with one mask per car.
+    before the search, we slide each car along its line through the empty lot, to
+    get, for each place it can be, the masks of the places it could slide to in
+    each direction, nearest first; a move is then legal up to the first of those
+    masks that ANDs with the other squares occupied.  the path comes back in
+    solve_parking_puzzle's form."""
+    names = [c for (c, squares) in start if c not in '|@']
+    d = dict(start)
+    walls = to_mask(d.get('|', ()))
+    goal = to_mask(d['@'])
+    star = names.index('*')
+    slides = [slide_masks(to_mask(d[c]), 1 if d[c][1] - d[c][0] == 1 else N, walls)
+              for c in names]
+
+    def successors(state):
+        occupied = walls
+        for m in state:
+            occupied |= m
+        results = {}
+        for (i, m) in enumerate(state):
+            others = occupied ^ m
+            for line in slides[i][m]:
+                for (m2, distance) in line:
+                    if m2 & others:
+                        break
+                    results[state[:i] + (m2,) + state[i+1:]] = (names[i], distance)
+        return results
+
+    path = shortest_path_search(tuple(to_mask(d[c]) for c in names), successors,
+                                lambda state: state[star] & goal, stats=stats)
+    return [x if i % 2 else from_masks(start, names, x) for (i, x) in enumerate(path)]
+
+def slide_masks(mask, delta, walls):
+    """for a car at mask that moves delta squares at a time, return a dict of
+    {place: (forward, back)}, for each place on its line that is clear of walls,
+    where forward and back are lists of (mask, distance) pairs, nearest first."""
+    while not (mask >> delta) & walls:  # back up to the first place on the line
+        mask >>= delta
+    places = []
+    while not mask & walls:
+        places.append(mask)
+        mask <<= delta
+    return dict((m, ([(m2, (k-j)*delta) for (k, m2) in enumerate(places) if k > j],
+                     [(m2, (k-j)*delta) for (k, m2) in reversed(list(enumerate(places))) if k < j]))
+                for (j, m) in enumerate(places))
+
+def to_mask(squares):
+    "the int with a bit set for each of the squares."
+    return sum(1 << s for s in squares)
+
+def from_masks(start, names, masks):
+    "the (object, locations) state with each car in names moved to the squares in its mask."
+    squares = dict((c, tuple(s for s in range(m.bit_length()) if m >> s & 1))
+                   for (c, m) in zip(names, masks))
+    return tuple((c, squares.get(c, sqs)) for (c, sqs) in start)
+
 def locs(start, n, incr=1):
     "Return a tuple of n locations, starting at start and incrementing by incr."
+    return tuple(start + i*incr for i in range(n))
 
 
 def grid(cars, N=N):
@@ -144,6 +259,10 @@ def grid(cars, N=N):
     pair, like ('@', (31,)), to indicate this. The variable 'cars'  is a
     tuple of pairs like ('*', (26, 27)). The return result is a big tuple
     of the 'cars' pairs along with the walls and goal pairs."""
+    goals = ((N**2)//2 - 1,)
+    walls = locs(0, N) + locs(N*(N-1), N) + locs(N, N-2, N) + locs(2*N-1, N-2, N)
+    walls = tuple(w for w in walls if w not in goals)
+    return cars + (('|', walls), ('@', goals))
 
 
 def show(state, N=N):
@@ -187,26 +306,20 @@ puzzle3 = grid((
 # Here are the shortest_path_search and path_actions functions from the unit.
 # You may use these if you want, but you don't have to.
 
-def shortest_path_search(start, successors, is_goal):
-    """Find the shortest path from start state to a state
-    such that is_goal(state) is true."""
-    if is_goal(start):
-        return [start]
-    explored = set() # set of states we have visited
-    frontier = [ [start] ] # ordered list of paths we have blazed
-    while frontier:
-        path = frontier.pop(0)
-        s = path[-1]
-        for (state, action) in successors(s).items():
-            if state not in explored:
-                explored.add(state)
-                path2 = path + [action, state]
-                if is_goal(state):
-                    return path2
-                else:
-                    frontier.append(path2)
-    return []
+from shortest_path_search import shortest_path_search
+from lowest_cost_search import astar_search
 
 def path_actions(path):
     "Return a list of actions in this path."
     return path[1::2]
+
+def test():
+    for puzzle in (puzzle1, puzzle2, puzzle3):
+        path = solve_parking_puzzle_bits(puzzle)
+        assert len(path) == len(solve_parking_puzzle(puzzle))
+        assert path[0] == puzzle and is_goal(path[-1])
+        assert all(psuccessors(path[i])[path[i+2]] == path[i+1] for i in range(0, len(path) - 2, 2))
+    return 'tests pass'
+
+if __name__ == '__main__':
+    print test()
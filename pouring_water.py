@@ -15,27 +15,16 @@
 # path to extend on each iteration and a set (read: hash table) is used to keep track of all
 # visited nodes, which are quickly checked against at each node so to avoid duplicating effort
 
-def pour_problem(X, Y, goal, start=(0, 0)):
+from shortest_path_search import shortest_path_search, shortest_path_table
+
+def pour_problem(X, Y, goal, start=(0, 0), stats=None):
     """X and Y are the capacity of the glasses; (x,y) is the current fill levels
     and represents a state.  the goal is a level that can be in either glass.
     begin at start state and follow successors until we reach goal.
-    keep track of frontier and previously explored; fail when no frontier."""
-    if goal in start:
-        return [start]
-    explored = set()  # set of states we have visited
-    frontier = [ [start] ]  # ordered list of paths we have blazed
-    while frontier:
-        path = frontier.pop(0)
-        (x, y) = path[-1]  # last state in the first path of the frontier
-        for (state, action) in successors(x, y, X, Y).items():
-            if state not in explored:
-                explored.add(state)
-                path2 = path + [action, state]
-                if goal in state:
-                    return path2
-                else:
-                    frontier.append(path2)
-    return Fail
+    keep track of frontier and previously explored; fail when no frontier.
+    stats, if given, is a search_stats.SearchStats to count and time the search in."""
+    return shortest_path_search(start, lambda (x, y): successors(x, y, X, Y),
+                                lambda state: goal in state, stats=stats)
 
 Fail = []
 
@@ -69,7 +58,8 @@ def successors(x, y, X, Y):
 # ('empty', i), ('pour', i, j) where i and j are indices indicating the 
 # glass number. 
 
-def more_pour_problem(capacities, goal, start=None):
+def more_pour_problem(capacities, goal, start=None, canonicalize=None, stats=None,
+                      successors=None):
     """The first argument is a tuple of capacities (numbers) of glasses; the
     goal is a number which we must achieve in some glass.  start is a tuple
     of starting levels for each glass; if None, that means 0 for all.
@@ -77,32 +67,106 @@ def more_pour_problem(capacities, goal, start=None):
     Keep track of frontier and previously explored; fail when no frontier.
     On success return a path: a [state, action, state2, ...] list, where an
     action is one of ('fill', i), ('empty', i), ('pour', i, j), where
-    i and j are indices indicating the glass number."""
-    # your code here
-    
-    
-def shortest_path_search(start, successors, is_goal):
-    """Find the shortest path from start state to a state
-    such that is_goal(state) is true."""
-    if is_goal(start):
-        return [start]
-    explored = set()
-    frontier = [ [start] ] 
-    while frontier:
-        path = frontier.pop(0)
-        s = path[-1]
-        for (state, action) in successors(s).items():
-            if state not in explored:
-                explored.add(state)
-                path2 = path + [action, state]
-                if is_goal(state):
-                    return path2
-                else:
-                    frontier.append(path2)
-    return Fail
+    i and j are indices indicating the glass number.
+    canonicalize (glass_canonicalizer(capacities), say) and stats are passed on
+    to shortest_path_search.  successors(state, capacities) is more_pour_successors
+    by default; lazy_more_pour_successors makes them only as they are needed."""
+    if start is None:
+        start = (0,) * len(capacities)
+    successors = successors or more_pour_successors
+    return shortest_path_search(start, lambda state: successors(state, capacities),
+                                lambda state: goal in state, stats=stats, canonicalize=canonicalize)
+
+def glass_canonicalizer(capacities):
+    """return a function that maps a state of more_pour_problem to a representative of
+    all the states we get by swapping the levels of glasses with the same capacity:
+    the levels of each such group of glasses, in sorted order."""
+    groups = {}
+    for (i, capacity) in enumerate(capacities):
+        groups.setdefault(capacity, []).append(i)
+    groups = sorted(groups.values())
+    return lambda state: tuple(tuple(sorted(state[i] for i in group)) for group in groups)
+
+def more_pour_table(capacities, start=None):
+    """Solve more_pour_problem for every goal at once: return a dict of {goal: path}
+    from one breadth-first search over all the states reachable from start.  each
+    path is the one more_pour_problem(capacities, goal, start) returns, and a goal
+    that is not in the dict can't be reached."""
+    if start is None:
+        start = (0,) * len(capacities)
+    return shortest_path_table(start, lambda state: more_pour_successors(state, capacities),
+                               lambda state: state)
+
+def more_pour_successors(state, capacities):
+    """returns a dict of {state: action} pairs: fill or empty any glass, or pour
+    from one glass into another until the first is empty or the second is full."""
+    indices = range(len(state))
+    succ = {}
+    for i in indices:
+        succ[replace(state, i, capacities[i])] = ('fill', i)
+        succ[replace(state, i, 0)] = ('empty', i)
+        for j in indices:
+            if i != j:
+                amount = min(state[i], capacities[j] - state[j])
+                state2 = replace(state, i, state[i] - amount)
+                succ[replace(state2, j, state[j] + amount)] = ('pour', i, j)
+    return succ
+
+def lazy_more_pour_successors(state, capacities):
+    """more_pour_successors as a generator of (state, action) pairs, so that a search
+    can stop making them as soon as one of them reaches the goal."""
+    indices = range(len(state))
+    for i in indices:
+        yield replace(state, i, capacities[i]), ('fill', i)
+        yield replace(state, i, 0), ('empty', i)
+        for j in indices:
+            if i != j:
+                amount = min(state[i], capacities[j] - state[j])
+                state2 = replace(state, i, state[i] - amount)
+                yield replace(state2, j, state[j] + amount), ('pour', i, j)
+
+def vector_more_pour_successors(capacities):
+    """return (successors, actions): more_pour_successors for a whole (n, k) numpy array
+    of states at once (see vector_search), and the actions, in the order
+    more_pour_successors makes them, that successors' (n, a, k) result follows."""
+    import numpy as np
+    indices = range(len(capacities))
+    actions = []
+    for i in indices:
+        actions += [('fill', i), ('empty', i)] + [('pour', i, j) for j in indices if i != j]
+    capacities = np.array(capacities, np.int64)
+    def successors(states):
+        next_states = np.repeat(states[:, None, :], len(actions), axis=1)
+        for (a, action) in enumerate(actions):
+            if action[0] == 'fill':
+                next_states[:, a, action[1]] = capacities[action[1]]
+            elif action[0] == 'empty':
+                next_states[:, a, action[1]] = 0
+            else:
+                _, i, j = action
+                amount = np.minimum(states[:, i], capacities[j] - states[:, j])
+                next_states[:, a, i] -= amount
+                next_states[:, a, j] += amount
+        return next_states, np.ones(next_states.shape[:2], bool)
+    return successors, actions
+
+def more_pour_problem_vector(capacities, goal, start=None, stats=None):
+    """more_pour_problem, searching a whole layer of states at a time with numpy
+    arrays (see vector_search); for many glasses, or big ones."""
+    from vector_search import vector_shortest_path_search
+    if start is None:
+        start = (0,) * len(capacities)
+    successors, actions = vector_more_pour_successors(capacities)
+    return vector_shortest_path_search(start, successors, lambda states: (states == goal).any(axis=1),
+                                       capacities, actions, stats)
+
+def replace(sequence, i, val):
+    "Return copy of sequence, with sequence[i] replaced by val."
+    s = list(sequence)
+    s[i] = val
+    return type(sequence)(s)
+
 
-Fail = []
-    
 def test_more_pour():
     assert more_pour_problem((1, 2, 4, 8), 4) == [
         (0, 0, 0, 0), ('fill', 2), (0, 0, 4, 0)]
@@ -112,6 +176,16 @@ def test_more_pour():
     assert not any(more_pour_problem(starbucks, odd) for odd in (3, 5, 7, 9))
     assert all(more_pour_problem((1, 3, 9, 27), n) for n in range(28))
     assert more_pour_problem((1, 3, 9, 27), 28) == []
+    table = more_pour_table((1, 3, 9, 27))
+    assert sorted(table) == range(28)
+    assert all(table[n] == more_pour_problem((1, 3, 9, 27), n) for n in range(28))
+    assert not any(odd in more_pour_table(starbucks) for odd in (3, 5, 7, 9))
+    twins = (3, 3, 5, 5)
+    assert all(len(more_pour_problem(twins, n, canonicalize=glass_canonicalizer(twins)))
+               == len(more_pour_problem(twins, n)) for n in range(6))
+    assert all(len(more_pour_problem((1, 3, 9, 27), n, successors=lazy_more_pour_successors))
+               == len(table[n]) for n in range(28))
     return 'test_more_pour passes'
 
-print test_more_pour()
+if __name__ == '__main__':
+    print test_more_pour()
@@ -0,0 +1,362 @@
+"""
+benchmarks for the search engines
+
+timing and counting turn a hunch about which engine is faster into a measurement
+(see the notes on timedcalls in class_notes; here we time by the wall clock, since
+time.clock would leave out the time spent in worker processes).  each benchmark runs the same problems
+through two or more engines and reports, for each run, the number of nodes expanded
+(calls to the successors function) and the time taken
+
+compare_astar: lowest_cost_search vs astar_search on growing bridge problems and on
+the parking puzzles
+
+compare_bridge_encodings: bridge_problem2 (frozenset states) vs bridge_problem_bits
+(int bitmask states) on growing bridge problems
+
+compare_parking_encodings: solve_parking_puzzle (tuples of squares) vs
+solve_parking_puzzle_bits (bitboards) on the parking puzzles
+
+compare_canonicalization: the number of states explored with and without
+canonicalizing symmetric states, on bridge crowds and on glasses of equal capacity
+
+compare_state_graph: the time to build, save and load a state_graph.StateGraph of a
+whole problem, and the time per query on it, against searching from scratch with
+shortest_path_search and lowest_cost_search (this one needs numpy)
+
+compare_parallel: parallel_shortest_path_search with 1, 2, 4 and 8 worker processes,
+against shortest_path_search, on big missionaries-and-cannibals problems and on the
+parking puzzles (here we time the runs but can't count expansions, which happen in
+the workers)
+
+the suite runs every engine on every problem at growing sizes and writes one record
+per run to a json file, so that a change to an engine can be judged by running the
+suite before and after and comparing the two files:
+
+    python search_benchmarks.py run before.json
+    ... change an engine ...
+    python search_benchmarks.py run after.json
+    python search_benchmarks.py compare before.json after.json
+
+each record has the problem, size and engine, the wall-clock seconds, the nodes
+expanded and generated, the length (and, for cost searches, the cost) of the path,
+and the peak memory in bytes.  each run happens in a child process of its own so that
+one run's garbage can't count against the next.  peak memory comes from tracemalloc
+where there is one (python 3.4 and up), and otherwise from the growth in the child's
+maximum resident set size; the record's memory_measure says which
+"""
+
+import json
+import multiprocessing
+import random
+import sys
+import time
+from functools import partial
+from decorators import countcalls, callcounts
+from lowest_cost_search import astar_search, path_cost
+from shortest_path_search import shortest_path_search, parallel_shortest_path_search
+from search_stats import SearchStats
+import bridge_problem
+import cannibals_missionaries
+import pouring_water
+import parking_lot_search
+
+def timedcall(fn, *args):
+    "call fn w/ args; return wall-clock time in seconds and result"
+    t0 = time.time()
+    result = fn(*args)
+    t1 = time.time()
+    return t1-t0, result
+
+def run(search, successors, *args):
+    """call search with a counted copy of successors followed by args;
+    return (nodes expanded, seconds, path)."""
+    successors = countcalls(successors)
+    seconds, path = timedcall(search, successors, *args)
+    return callcounts[successors], seconds, path
+
+def report(problem, engine, expanded, seconds, cost):
+    print '%-24s %-10s %10d %10.4f %8s' % (problem, engine, expanded, seconds, cost)
+
+def compare_astar(sizes=(4, 6, 8, 10, 12), seed=42):
+    """expand the bridge problem for each number of people in sizes, and each
+    parking puzzle, with uniform-cost search and with A*."""
+    print '%-24s %-10s %10s %10s %8s' % ('problem', 'engine', 'expanded', 'seconds', 'cost')
+    rand = random.Random(seed)
+    for n in sizes:
+        people = rand.sample(range(1, 100), n)
+        start = (frozenset(people) | frozenset(['light']), frozenset())
+        for (engine, heuristic) in (('ucs', None), ('astar', bridge_problem.bheuristic)):
+            expanded, seconds, path = run(
+                lambda succ: astar_search(start, succ, bridge_problem.all_over,
+                                          bridge_problem.bcost, heuristic),
+                bridge_problem.bsuccessors2)
+            report('bridge %d people' % n, engine, expanded, seconds, path_cost(path))
+    N = parking_lot_search.N
+    for name in ('puzzle1', 'puzzle2', 'puzzle3'):
+        start = getattr(parking_lot_search, name)
+        successors = lambda state: parking_lot_search.psuccessors(state, N)
+        is_goal = parking_lot_search.is_goal
+        expanded, seconds, path = run(
+            lambda succ: shortest_path_search(start, succ, is_goal), successors)
+        report(name, 'bfs', expanded, seconds, len(path) // 2)
+        expanded, seconds, path = run(
+            lambda succ: astar_search(start, succ, is_goal, lambda action: 1,
+                                      lambda state: parking_lot_search.blocking_cars(state, N)),
+            successors)
+        report(name, 'astar', expanded, seconds, path_cost(path))
+
+def compare_bridge_encodings(sizes=(6, 8, 10, 12, 14), seed=42):
+    """time bridge_problem2 and bridge_problem_bits on the bridge problem for each
+    number of people in sizes."""
+    print '%-24s %-10s %10s %8s' % ('problem', 'engine', 'seconds', 'cost')
+    rand = random.Random(seed)
+    for n in sizes:
+        people = rand.sample(range(1, 100), n)
+        for (engine, solve) in (('frozenset', bridge_problem.bridge_problem2),
+                                ('bits', bridge_problem.bridge_problem_bits)):
+            seconds, path = timedcall(solve, people)
+            print '%-24s %-10s %10.4f %8s' % ('bridge %d people' % n, engine, seconds, path_cost(path))
+
+def compare_parking_encodings(repeat=20):
+    """time solve_parking_puzzle and solve_parking_puzzle_bits on each parking
+    puzzle, taking the best of repeat runs, and report how many times as fast as
+    the tuples the bits are."""
+    print '%-24s %-10s %10s %8s %8s' % ('problem', 'engine', 'seconds', 'length', 'speedup')
+    for name in ('puzzle1', 'puzzle2', 'puzzle3'):
+        start = getattr(parking_lot_search, name)
+        for (engine, solve) in (('tuples', parking_lot_search.solve_parking_puzzle),
+                                ('bits', parking_lot_search.solve_parking_puzzle_bits)):
+            seconds, path = min(timedcall(solve, start) for _ in range(repeat))
+            if engine == 'tuples':
+                tuple_seconds = seconds
+            print '%-24s %-10s %10.4f %8d %8.1f' % (name, engine, seconds, len(path) // 2,
+                                                    tuple_seconds / seconds)
+
+def compare_canonicalization():
+    """explore bridge crowds with several people of each time, and glasses with
+    several of each capacity, with and without canonicalizing; report the peak
+    number of states explored, and the time taken."""
+    print '%-24s %-10s %10s %10s %8s' % ('problem', 'engine', 'explored', 'seconds', 'cost')
+    for people in ([1, 1, 2, 2, 5, 5], [1, 2, 2, 2, 5, 5, 5, 8], [3, 3, 3, 3, 3, 3, 3, 3, 3]):
+        for canonicalize in (False, True):
+            stats = SearchStats()
+            seconds, path = timedcall(bridge_problem.bridge_problem_crowd, people, canonicalize, stats)
+            print '%-24s %-10s %10d %10.4f %8s' % ('bridge %s' % ''.join(map(str, people)),
+                                                  'canonical' if canonicalize else 'plain',
+                                                  stats.explored_peak, seconds, path_cost(path))
+    for (capacities, goal) in (((3, 3, 5, 5), 4), ((2, 2, 2, 7, 7), 6), ((4, 4, 4, 9, 9, 9), 11)):
+        for canonicalize in (None, pouring_water.glass_canonicalizer(capacities)):
+            stats = SearchStats()
+            seconds, path = timedcall(pouring_water.more_pour_problem, capacities, goal, None,
+                                      canonicalize, stats)
+            print '%-24s %-10s %10d %10.4f %8s' % ('pour %s -> %d' % (capacities, goal),
+                                                  'canonical' if canonicalize else 'plain',
+                                                  stats.explored_peak, seconds, len(path) // 2)
+
+def compare_state_graph(queries=200, seed=42):
+    """build a StateGraph for each of a few small problems, save it and load it back;
+    then answer queries from random states to the goal on it, and by searching."""
+    import shutil
+    import tempfile
+    from state_graph import StateGraph
+    from lowest_cost_search import lowest_cost_search
+    B, M, P = bridge_problem, cannibals_missionaries, pouring_water
+    rand = random.Random(seed)
+    capacities = (4, 4, 5, 5, 9)
+    bridge = (frozenset([1, 2, 5, 10, 15, 20, 'light']), frozenset())
+    problems = [  # (name, start, successors, is_goal, action_cost)
+        ('mc 30+15', (30, 15, 1, 0, 0, 0), M.csuccessors, lambda state: state == (0, 0, 0, 30, 15, 1), None),
+        ('pour %s -> 3' % (capacities,), (0,) * len(capacities),
+         lambda state: P.more_pour_successors(state, capacities), lambda state: 3 in state, None),
+        ('bridge 6 people', bridge, B.bsuccessors2, B.all_over, B.bcost)]
+    print '%-24s %-10s %10s %12s' % ('problem', 'step', 'states', 'seconds')
+    for (name, start, successors, is_goal, action_cost) in problems:
+        seconds, graph = timedcall(StateGraph.build, start, successors, action_cost)
+        print '%-24s %-10s %10d %12.6f' % (name, 'build', len(graph), seconds)
+        directory = tempfile.mkdtemp()
+        try:
+            seconds, _ = timedcall(graph.save, directory)
+            print '%-24s %-10s %10d %12.6f' % (name, 'save', len(graph), seconds)
+            seconds, graph = timedcall(StateGraph.load, directory)
+            print '%-24s %-10s %10d %12.6f' % (name, 'load', len(graph), seconds)
+            starts = [rand.choice(graph.states) for _ in range(queries)]
+            goals = graph.goal_mask(is_goal)
+            if action_cost is None:
+                on_graph = lambda: [graph.shortest_path(s, goals) for s in starts]
+                searched = lambda: [shortest_path_search(s, successors, is_goal) for s in starts]
+            else:
+                on_graph = lambda: [graph.lowest_cost_path(s, goals) for s in starts]
+                searched = lambda: [lowest_cost_search(s, successors, is_goal, action_cost) for s in starts]
+            for (step, answer) in (('graph', on_graph), ('search', searched)):
+                seconds, _ = timedcall(answer)
+                print '%-24s %-10s %10d %12.6f' % (name, step, len(graph), seconds / queries)
+        finally:
+            shutil.rmtree(directory)
+
+def compare_parallel(workers=(1, 2, 4, 8), sizes=(20, 40, 80)):
+    """time shortest_path_search and parallel_shortest_path_search, with each number
+    of workers, on missionaries and cannibals problems with 2n missionaries and n
+    cannibals for each n in sizes, and on the parking puzzles."""
+    print '%-24s %-10s %10s %8s' % ('problem', 'engine', 'seconds', 'length')
+    problems = []
+    for n in sizes:
+        start = (2*n, n, 1, 0, 0, 0)
+        goal = (0, 0, 0) + start[:3]
+        problems.append(('mc %d+%d' % (2*n, n), start, cannibals_missionaries.csuccessors,
+                         lambda state, goal=goal: state == goal))
+    for name in ('puzzle1', 'puzzle2', 'puzzle3'):
+        problems.append((name, getattr(parking_lot_search, name),
+                         partial(parking_lot_search.psuccessors, N=parking_lot_search.N),
+                         parking_lot_search.is_goal))
+    for (problem, start, successors, is_goal) in problems:
+        seconds, path = timedcall(shortest_path_search, start, successors, is_goal)
+        print '%-24s %-10s %10.4f %8d' % (problem, 'bfs', seconds, len(path) // 2)
+        for n in workers:
+            seconds, path = timedcall(parallel_shortest_path_search, start, successors, is_goal, n)
+            print '%-24s %-10s %10.4f %8d' % (problem, 'parallel-%d' % n, seconds, len(path) // 2)
+
+def suite_cases(sizes=(4, 6, 8, 10), seed=42):
+    """return a list of (problem, size, engine, solve, cost) benchmark cases, where
+    solve(stats) runs the case, counting it in stats, and returns the path, and
+    cost(path) is the cost of the path (None for the breadth-first problems)."""
+    B, P, L, M = bridge_problem, pouring_water, parking_lot_search, cannibals_missionaries
+    try:
+        import numpy  # for the vector_search cases
+        vector = True
+    except ImportError:
+        vector = False
+    rand = random.Random(seed)
+    cases = []
+    for n in sizes:
+        people = rand.sample(range(1, 100), n)
+        for (engine, solve) in (('heapq', B.bridge_problem), ('ucs', B.bridge_problem2),
+                                ('astar', B.bridge_problem3), ('bits', B.bridge_problem_bits)):
+            if solve is B.bridge_problem and n > 8:
+                continue  # its states include the time, so it takes minutes past 8 people
+            cost = B.elapsed_time if solve is B.bridge_problem else path_cost
+            cases.append(('bridge', n, engine, partial(solve, people, stats=None), cost))
+    for n in sizes:
+        X, Y = 10*n + 1, 10*n + 3  # reaching Y - 1 takes 2*X steps
+        cases.append(('pour', n, 'bfs', partial(P.pour_problem, X, Y, Y - 1, stats=None), None))
+    for n in sizes:
+        capacities, goal = (n, n, n + 1, n + 1), n // 2
+        for (engine, canonicalize) in (('bfs', None), ('canonical', P.glass_canonicalizer(capacities))):
+            cases.append(('more_pour', n, engine,
+                          partial(P.more_pour_problem, capacities, goal, None, canonicalize, stats=None),
+                          None))
+        cases.append(('more_pour', n, 'lazy',
+                      partial(P.more_pour_problem, capacities, goal, successors=P.lazy_more_pour_successors,
+                              stats=None), None))
+        if vector:
+            cases.append(('more_pour', n, 'vector',
+                          partial(P.more_pour_problem_vector, capacities, goal, stats=None), None))
+    for n in sizes:
+        for (engine, successors) in (('bfs', M.csuccessors), ('lazy', M.lazy_csuccessors)):
+            cases.append(('mc', 5*n, engine, partial(M.mc_problem, (10*n, 5*n, 1, 0, 0, 0),
+                                                     successors=successors, stats=None), None))
+        if vector:
+            cases.append(('mc', 5*n, 'vector', partial(M.mc_problem_vector, (10*n, 5*n, 1, 0, 0, 0),
+                                                       stats=None), None))
+    for (i, name) in enumerate(('puzzle1', 'puzzle2', 'puzzle3')):
+        start = getattr(L, name)
+        for (engine, solve) in (('bfs', L.solve_parking_puzzle),
+                                ('astar', partial(L.solve_parking_puzzle, heuristic=L.blocking_cars)),
+                                ('bits', L.solve_parking_puzzle_bits)):
+            cases.append(('parking', i + 1, engine, partial(solve, start, stats=None), None))
+    return [(problem, size, engine, lambda stats, solve=solve: solve(stats=stats), cost)
+            for (problem, size, engine, solve, cost) in cases]
+
+def measure(solve, cost, queue):
+    """run solve(stats) and put a record of its time, counts, path and peak memory on
+    the queue (or, if it raises an exception, a record of the error).  meant to run
+    in a child process of its own."""
+    try:
+        queue.put(measure1(solve, cost))
+    except Exception as e:
+        queue.put(dict(error=repr(e)))
+
+def measure1(solve, cost):
+    try:
+        import tracemalloc
+    except ImportError:
+        import resource
+        tracemalloc = None
+        rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    else:
+        tracemalloc.start()
+    stats = SearchStats()
+    seconds, path = timedcall(solve, stats)
+    if tracemalloc:
+        peak, memory_measure = tracemalloc.get_traced_memory()[1], 'tracemalloc'
+        tracemalloc.stop()
+    else:  # ru_maxrss is in kilobytes on linux
+        peak = 1024 * (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss0)
+        memory_measure = 'maxrss'
+    record = dict(seconds=seconds, expanded=stats.expanded, generated=stats.generated,
+                  length=len(path) // 2, peak_memory=peak, memory_measure=memory_measure)
+    if cost and path:
+        record['cost'] = cost(path)
+    return record
+
+def run_suite(filename=None, cases=None, verbose=True):
+    """run each of the cases (by default, suite_cases()) in a child process; return a
+    list of records, one for each, and write them to filename as json if given."""
+    records = []
+    for (problem, size, engine, solve, cost) in (suite_cases() if cases is None else cases):
+        queue = multiprocessing.Queue()
+        child = multiprocessing.Process(target=measure, args=(solve, cost, queue))
+        child.start()
+        record = queue.get()
+        child.join()
+        record.update(problem=problem, size=size, engine=engine)
+        records.append(record)
+        if 'error' in record:
+            print '%-10s %6s %-10s failed: %s' % (problem, size, engine, record['error'])
+        elif verbose:
+            print '%-10s %6s %-10s %10d %10.4f %12d %8d' % (
+                problem, size, engine, record['expanded'], record['seconds'],
+                record['peak_memory'], record['length'])
+    if filename:
+        with open(filename, 'w') as f:
+            json.dump(records, f, indent=1, sort_keys=True)
+    return records
+
+def compare_runs(before, after, fields=('seconds', 'expanded', 'peak_memory')):
+    """compare two runs of the suite, given as filenames or lists of records: for each
+    case in both, print each field before and after, and the ratio after/before (below
+    1 is better).  return a dict of {(problem, size, engine): {field: ratio}}."""
+    def load(run):
+        if isinstance(run, basestring):
+            with open(run) as f:
+                run = json.load(f)
+        return dict(((r['problem'], r['size'], r['engine']), r) for r in run)
+    before, after = load(before), load(after)
+    print '%-10s %6s %-10s' % ('problem', 'size', 'engine') + ''.join(
+        ' %32s' % field for field in fields)
+    ratios = {}
+    for key in sorted(set(before) & set(after)):
+        old, new = before[key], after[key]
+        if 'error' in old or 'error' in new:
+            print '%-10s %6s %-10s' % key, 'failed:', old.get('error') or new.get('error')
+            continue
+        ratios[key] = dict((field, float(new[field]) / old[field] if old[field] else None)
+                           for field in fields)
+        print '%-10s %6s %-10s' % key + ''.join(
+            ' %12.4g %12.4g %6s' % (old[field], new[field],
+                                    '-' if ratios[key][field] is None else '%.2f' % ratios[key][field])
+            for field in fields)
+        if old.get('length') != new.get('length') or old.get('cost') != new.get('cost'):
+            print '    different answer: length %s -> %s, cost %s -> %s' % (
+                old.get('length'), new.get('length'), old.get('cost'), new.get('cost'))
+    return ratios
+
+if __name__ == '__main__' and sys.argv[1:2] == ['run']:
+    run_suite(sys.argv[2] if len(sys.argv) > 2 else 'benchmarks.json')
+elif __name__ == '__main__' and sys.argv[1:2] == ['compare']:
+    compare_runs(sys.argv[2], sys.argv[3])
+elif __name__ == '__main__':
+    compare_astar()
+    compare_bridge_encodings()
+    compare_parking_encodings()
+    compare_canonicalization()
+    compare_parallel()
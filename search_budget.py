@@ -0,0 +1,58 @@
+'''
+time and expansion budgets for the search engines
+
+a hard problem can keep a search going for longer than we can wait.  pass a deadline
+(a time.time() value) or max_expansions to a search, and when it runs out of either
+it stops and returns a Partial path instead of carrying on: the best path to a goal
+it has found so far, if any, and otherwise the most promising path still on its
+frontier.  either way the Partial's lower_bound says how good the best path could be
+
+    path = lowest_cost_search(start, successors, is_goal, cost, deadline=time.time() + 5)
+    if isinstance(path, Partial):
+        print 'gave up at', path_cost(path), 'with a lower bound of', path.lower_bound
+
+a search that is not given a budget never checks one
+'''
+
+import time
+
+class Partial(list):
+    """a path from a search that ran out of budget before it could finish.  complete
+    is true if the path ends at a goal (the best one found so far), false if it is the
+    most promising path still on the frontier.  lower_bound is a cost (for
+    shortest_path_search, a number of actions) that no path to a goal can be below.
+    shortest_path_search's path is to the last state on its frontier (one of the
+    deepest reached), and its lower bound is one action more than the path to the
+    first, the shallowest not yet expanded, which may be a layer less deep."""
+
+    def __init__(self, path, complete, lower_bound):
+        list.__init__(self, path)
+        self.complete = complete
+        self.lower_bound = lower_bound
+
+    def __repr__(self):
+        return 'Partial(%s, complete=%r, lower_bound=%r)' % (
+            list.__repr__(self), self.complete, self.lower_bound)
+
+class Budget(object):
+    "a deadline (a time.time() value) and/or a most number of expansions for one search."
+
+    def __init__(self, deadline=None, max_expansions=None):
+        self.deadline = deadline
+        self.max_expansions = max_expansions
+        self.expansions = 0
+
+    def spent(self):
+        "return True if the budget is used up; otherwise count one more expansion."
+        if self.max_expansions is not None and self.expansions >= self.max_expansions:
+            return True
+        if self.deadline is not None and time.time() >= self.deadline:
+            return True
+        self.expansions += 1
+        return False
+
+def make_budget(deadline=None, max_expansions=None):
+    "return a Budget, or None if there is no limit to keep to."
+    if deadline is None and max_expansions is None:
+        return None
+    return Budget(deadline, max_expansions)
@@ -0,0 +1,108 @@
+'''
+instrumentation for the search engines
+
+pass stats=SearchStats() to a search to find out why it is slow.  the search wraps its
+successors and is_goal functions with the stats object (so it can count and time them),
+and tells it about duplicates and the size of its frontier and explored set as it goes.
+when the search is not given a stats object, none of this happens: the only cost left
+is a test of stats against None once per expansion
+
+    stats = SearchStats()
+    shortest_path_search(start, successors, is_goal, stats=stats)
+    print stats.report()
+
+a callback, if given, is called with the stats object when the search finishes
+'''
+
+import time
+
+class SearchStats(object):
+    "counters and timers for one run of a search."
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.expanded = 0  # calls to successors
+        self.generated = 0  # (state, action) pairs successors returned
+        self.duplicates = 0  # of those, ones the search threw away as already seen
+        self.pruned = 0  # and ones it threw away as dominated by a state already seen
+        self.frontier_peak = 0
+        self.explored_peak = 0
+        self.successors_time = 0.0
+        self.goal_time = 0.0
+        self.depth = None  # number of actions in the path found (None if it failed)
+
+    def watch(self, successors, is_goal):
+        "return copies of successors and is_goal that count and time their calls."
+        def counted_successors(state):
+            t0 = time.time()
+            result = successors(state)
+            self.successors_time += time.time() - t0
+            self.expanded += 1
+            if not isinstance(result, dict):
+                return self.counted_pairs(result)
+            self.generated += len(result)
+            return result
+        def timed_is_goal(state):
+            t0 = time.time()
+            result = is_goal(state)
+            self.goal_time += time.time() - t0
+            return result
+        return counted_successors, timed_is_goal
+
+    def counted_pairs(self, pairs):
+        """generate the (state, action) pairs a lazy successors function yields, counting
+        and timing only the ones the search asks for."""
+        pairs = iter(pairs)
+        while True:
+            t0 = time.time()
+            try:
+                pair = next(pairs)
+            except StopIteration:
+                self.successors_time += time.time() - t0
+                return
+            self.successors_time += time.time() - t0
+            self.generated += 1
+            yield pair
+
+    def sizes(self, frontier, explored):
+        "note the current sizes of the frontier and explored set."
+        self.frontier_peak = max(self.frontier_peak, frontier)
+        self.explored_peak = max(self.explored_peak, explored)
+
+    def done(self, path):
+        "note the path the search found (or Fail), call back, and return the path."
+        self.depth = len(path) // 2 if path else None
+        if self.callback:
+            self.callback(self)
+        return path
+
+    @property
+    def pruning_rate(self):
+        "the fraction of the pairs generated that were pruned as dominated."
+        return float(self.pruned) / self.generated if self.generated else 0.0
+
+    @property
+    def branching_factor(self):
+        """the effective branching factor b: the branching factor a uniform tree of
+        the solution's depth would need to hold as many nodes as were generated, so
+        that generated + 1 == 1 + b + b**2 + ... + b**depth."""
+        if not self.depth:
+            return None
+        def tree_size(b): return sum(b**i for i in range(1, self.depth + 1))
+        lo, hi = 0.0, float(max(self.generated, 1))
+        for _ in range(64):  # bisection
+            mid = (lo + hi) / 2
+            if tree_size(mid) < self.generated:
+                lo = mid
+            else:
+                hi = mid
+        return lo
+
+    def report(self):
+        "return a summary of the stats as a string."
+        return ('expanded %d, generated %d, duplicates %d, pruned %d (%.1f%%), frontier peak %d, '
+                'explored peak %d, branching factor %s, %.4fs in successors, %.4fs in is_goal'
+                % (self.expanded, self.generated, self.duplicates, self.pruned,
+                   100 * self.pruning_rate, self.frontier_peak,
+                   self.explored_peak, '%.3f' % self.branching_factor if self.depth else None,
+                   self.successors_time, self.goal_time))
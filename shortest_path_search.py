@@ -26,25 +26,303 @@ and our solution's interface to them will be their signatures as well as the sta
 respectively, that they return
 
 our solution: shortest_path_search(start, successors, goal) -> path
+
+the frontier holds states rather than paths: each state we reach gets one parent
+pointer (the state we came from and the action we took), and the path is rebuilt
+from those pointers only once we reach a goal.  this keeps the memory per visited
+state constant, whatever the depth of the solution
+
+when the goal is one explicit state, rather than a test, we can also search backward
+from it: bidirectional_search(start, goal, successors, predecessors) -> path grows a
+frontier from each end, one layer at a time, until the two meet.  with branching
+factor b and solution depth d, that explores about 2*b**(d/2) states instead of b**d
+
+successors of different states are independent of one another, so a whole layer of the
+frontier can be expanded at once on several cores: parallel_shortest_path_search hands
+chunks of each layer to a pool of worker processes and merges what they send back, in
+order, into one set of parent pointers.  it finds the same path as shortest_path_search
+
+when many goals are asked about from the same start, shortest_path_table runs one search
+over everything reachable from start and returns a table of the shortest path to each goal,
+so that every later question is a dict lookup
+
+successors may return a generator of (state, action) pairs instead of a dict.  then the
+search tests each state as it is made, and stops making them once it reaches a goal,
+rather than building (and hashing) every sibling of the goal first
 '''
 
-def shortest_path_search(start, successors, is_goal):
-    """Find the shortest path from start state to a state
-    such that is_goal(state) is true."""
+import multiprocessing
+from collections import deque
+from search_budget import Partial, make_budget
+
+def shortest_path_search(start, successors, is_goal, parents=None, stats=None, canonicalize=None,
+                         deadline=None, max_expansions=None, explored=None, checkpoint=None):
+    """Find the shortest path from start state to a state such that is_goal(state) is
+    true.  parents, if given, is an empty dict-like container for the parent pointers
+    (an out_of_core.DiskDict, say, to search past the memory we have); explored, if
+    given, is a set-like container for the visited states instead (see
+    linked_path_search).  stats is a search_stats.SearchStats to count and time the
+    search in.  canonicalize maps each state to a representative of the states the
+    same as it up to symmetry; states with the same representative are treated as one.
+    deadline and max_expansions bound the search (see search_budget.Partial).
+    checkpoint is a checkpoint.Checkpoint to save the search to now and then, and to
+    resume it from (not with explored)."""
+    if explored is not None:
+        return linked_path_search(start, successors, is_goal, explored, stats, canonicalize,
+                                  deadline, max_expansions)
+    if stats is not None:
+        successors, is_goal = stats.watch(successors, is_goal)
     if is_goal(start):
-        return [start]
-    explored = set()  # sets of states we have visited
-    frontier = [ [start] ]  # heap of paths we have blazed (ordered by length)
+        return stats.done([start]) if stats else [start]
+    if parents is None:
+        parents = {}  # state -> (previous state, action); doubles as our set of visited states
+    saved = checkpoint.load('shortest_path_search', start) if checkpoint is not None else None
+    if saved is None:
+        parents[start if canonicalize is None else canonicalize(start)] = None
+        frontier = deque([start])  # queue of states we have reached (ordered by path length)
+        added = [(start, None)]  # (state, parent) added to parents since the last checkpoint
+    else:
+        # states join the frontier in the order they join parents, so the frontier
+        # is the last len(frontier) of them
+        added, n = saved
+        for (state, parent) in added:
+            parents[state if canonicalize is None else canonicalize(state)] = parent
+        frontier = deque(state for (state, parent) in added[len(added) - n:])
+        added = []
+    budget = make_budget(deadline, max_expansions)
     while frontier:
-        path = frontier.pop(0)
-        for (state, action) in successors(path[-1]).items():
-            if state not in explored:
-                explored.add(state)
-                path2 = path + [action, state]
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save('shortest_path_search', start, added, len(frontier))
+            added = []
+        if budget is not None and budget.spent():
+            path = Partial(build_path(parents, frontier[-1], canonicalize), False,
+                           len(build_path(parents, frontier[0], canonicalize)) // 2 + 1)
+            return stats.done(path) if stats else path
+        s = frontier.popleft()
+        for (state, action) in successor_pairs(successors(s)):
+            key = state if canonicalize is None else canonicalize(state)
+            if key not in parents:
+                parents[key] = (s, action)
+                if checkpoint is not None:
+                    added.append((state, (s, action)))
                 if is_goal(state):
-                    return path2
+                    path = build_path(parents, state, canonicalize)
+                    return stats.done(path) if stats else path
                 else:
-                    frontier.append(path2)  # added to end of frontier heap
+                    frontier.append(state)  # added to end of frontier queue
+            elif stats is not None:
+                stats.duplicates += 1
+        if stats is not None:
+            stats.sizes(len(frontier), len(parents))
+    return stats.done(Fail) if stats else Fail
+
+def linked_path_search(start, successors, is_goal, explored, stats=None, canonicalize=None,
+                       deadline=None, max_expansions=None):
+    """shortest_path_search, keeping the visited states in explored (a set-like
+    container with add and in) and no parent pointers.  instead, each state on the
+    frontier is a (state, action, previous) link in a chain back to the start, so
+    the memory for paths is only what the frontier's chains still share.  if explored
+    is approximate (a bitstate.BitStateSet), it may wrongly skip states, and so miss
+    the shortest path or every path, but any path it returns is a real one."""
+    if stats is not None:
+        successors, is_goal = stats.watch(successors, is_goal)
+    if is_goal(start):
+        return stats.done([start]) if stats else [start]
+    explored.add(start if canonicalize is None else canonicalize(start))
+    frontier = deque([(start, None, None)])  # queue of links, ordered by path length
+    budget = make_budget(deadline, max_expansions)
+    while frontier:
+        if budget is not None and budget.spent():
+            path = Partial(link_path(frontier[-1]), False, len(link_path(frontier[0])) // 2 + 1)
+            return stats.done(path) if stats else path
+        link = frontier.popleft()
+        for (state, action) in successor_pairs(successors(link[0])):
+            key = state if canonicalize is None else canonicalize(state)
+            if key not in explored:
+                explored.add(key)
+                if is_goal(state):
+                    path = link_path((state, action, link))
+                    return stats.done(path) if stats else path
+                frontier.append((state, action, link))
+            elif stats is not None:
+                stats.duplicates += 1
+        if stats is not None:
+            stats.sizes(len(frontier), len(explored))
+    return stats.done(Fail) if stats else Fail
+
+def link_path(link):
+    "Follow a chain of (state, action, previous) links back to the start; return the path."
+    path = [link[0]]
+    while link[2] is not None:
+        state, action, link = link
+        path += [action, link[0]]
+    path.reverse()
+    return path
+
+def successor_pairs(result):
+    """Return the (state, action) pairs in result, which a successors function returned:
+    either a {state: action} dict, or an iterable of (state, action) pairs (a generator,
+    say, which a search consumes only as far as it needs to).  when a generator yields
+    the same state twice, the search keeps the first action for it."""
+    return result.iteritems() if isinstance(result, dict) else result
+
+def shortest_path_table(start, successors, goals_of):
+    """Search breadth-first over every state reachable from start; return a dict of
+    {goal: path} with, for each goal, the path shortest_path_search would find to a
+    state satisfying it, where goals_of(state) lists the goals a state satisfies.
+    a goal missing from the dict cannot be reached from start."""
+    parents = {start: None}
+    found = dict((goal, start) for goal in goals_of(start))  # goal -> first state found to satisfy it
+    frontier = deque([start])
+    while frontier:
+        s = frontier.popleft()
+        for (state, action) in successor_pairs(successors(s)):
+            if state not in parents:
+                parents[state] = (s, action)
+                for goal in goals_of(state):
+                    found.setdefault(goal, state)
+                frontier.append(state)
+    return dict((goal, build_path(parents, state)) for (goal, state) in found.items())
+
+def build_path(parents, state, canonicalize=None):
+    """Follow parent pointers back from state to the start; return the [state, action, state...] path.
+    if the pointers are kept by canonical state, canonicalize is the function that made them."""
+    path = [state]
+    while True:
+        parent = parents[state if canonicalize is None else canonicalize(state)]
+        if parent is None:
+            break
+        state, action = parent
+        path += [action, state]
+    path.reverse()
+    return path
+
+def bidirectional_search(start, goal, successors, predecessors=None):
+    """Find the shortest path from start state to goal state, searching forward
+    from start with successors(state) => {state:action,...} and backward from goal
+    with predecessors(state) => {state2:action,...}, where action takes state2 to
+    state.  if predecessors is None, the problem is taken to be reversible and
+    predecessors are worked out from successors."""
+    if start == goal:
+        return [start]
+    if predecessors is None:
+        predecessors = reverse_successors(successors)
+    forward, backward = {start: None}, {goal: None}  # parent pointers for each direction
+    ffrontier, bfrontier = [start], [goal]  # the deepest layer reached in each direction
+    while ffrontier and bfrontier:
+        # grow whichever frontier is smaller by one whole layer
+        if len(ffrontier) <= len(bfrontier):
+            ffrontier, meets = expand_layer(ffrontier, successors, forward, backward)
+        else:
+            bfrontier, meets = expand_layer(bfrontier, predecessors, backward, forward)
+        if meets:
+            # several states in this layer may meet the other search; keep the shortest join
+            return min((join_paths(forward, backward, state) for state in meets), key=len)
     return Fail
 
+def expand_layer(frontier, successors, parents, other):
+    """Expand every state in frontier; return the next layer of states and the
+    states in it that the search in the other direction has already reached."""
+    layer, meets = [], []
+    for s in frontier:
+        for (state, action) in successor_pairs(successors(s)):
+            if state not in parents:
+                parents[state] = (s, action)
+                layer.append(state)
+                if state in other:
+                    meets.append(state)
+    return layer, meets
+
+def join_paths(forward, backward, state):
+    "Join the path from start to state with the path from state on to the goal."
+    path = build_path(forward, state)
+    while backward[state] is not None:
+        state, action = backward[state]
+        path += [action, state]
+    return path
+
+def parallel_shortest_path_search(start, successors, is_goal, processes=None):
+    """Find the same shortest path as shortest_path_search, expanding each layer
+    of the frontier across a pool of processes (as many as there are cores, by
+    default).  successors must be picklable (a module-level function, or a
+    functools.partial of one); is_goal is only called here, so needn't be."""
+    if is_goal(start):
+        return [start]
+    processes = processes or multiprocessing.cpu_count()
+    parents = {start: None}
+    frontier = [start]  # the layer of states at the current depth
+    pool = multiprocessing.Pool(processes, set_worker_successors, (successors,))
+    try:
+        while frontier:
+            chunks = split(frontier, 4 * processes)
+            layer = []
+            # pool.map keeps the order of the chunks, so states are merged in the
+            # order shortest_path_search would have expanded them
+            for (chunk, expansions) in zip(chunks, pool.map(expand_chunk, chunks)):
+                for (s, items) in zip(chunk, expansions):
+                    for (state, action) in items:
+                        if state not in parents:
+                            parents[state] = (s, action)
+                            if is_goal(state):
+                                return build_path(parents, state)
+                            layer.append(state)
+            frontier = layer
+    finally:
+        pool.terminate()
+    return Fail
+
+def split(states, n):
+    "Split a list of states into at most n chunks of about equal size."
+    size = -(-len(states) // n)  # ceiling division
+    return [states[i:i+size] for i in range(0, len(states), size)]
+
+def set_worker_successors(successors):
+    "Pool initializer: keep the successors function for expand_chunk in this worker."
+    global worker_successors
+    worker_successors = successors
+
+def expand_chunk(states):
+    "In a worker process, return the successors of each state, as lists of (state, action) pairs."
+    return [list(successor_pairs(worker_successors(s))) for s in states]
+
+def reverse_successors(successors):
+    """For a reversible problem, return predecessors(state) => {state2:action,...}:
+    each state2 we can step to from state and back again, with the action that
+    takes state2 to state."""
+    def predecessors(state):
+        preds = {}
+        for (state2, _) in successor_pairs(successors(state)):
+            actions = successors(state2)
+            if not isinstance(actions, dict):
+                actions = dict(reversed(list(actions)))  # the first action to a state wins
+            if state in actions:
+                preds[state2] = actions[state]
+        return preds
+    return predecessors
+
 Fail = []
+
+def test():
+    # out of budget with the first state on the frontier a layer less deep than the last:
+    # the bound comes from the shallower one, since a child of it may be the goal
+    graph = {'S': {'A': 'a', 'B': 'b'}, 'A': {'A1': 'a1'}, 'B': {'G': 'g'}, 'A1': {}, 'G': {}}
+    for explored in (None, set()):
+        path = shortest_path_search('S', graph.get, lambda state: state == 'G', max_expansions=2,
+                                    explored=explored)
+        assert (path.complete, path.lower_bound) == (False, 2), path
+        assert len(shortest_path_search('S', graph.get, lambda state: state == 'G')) // 2 == 2
+    from cannibals_missionaries import csuccessors, mc_problem
+    for start in [(3, 3, 1, 0, 0, 0), (40, 20, 1, 0, 0, 0)]:
+        goal = start[3:] + start[:3]
+        path = bidirectional_search(start, goal, csuccessors)
+        assert len(path) == len(mc_problem(start)) and path[0] == start and path[-1] == goal
+        assert all(csuccessors(path[i])[path[i+2]] == path[i+1] for i in range(0, len(path) - 2, 2))
+    assert bidirectional_search((4, 4, 1, 0, 0, 0), (0, 0, 0, 4, 4, 1), csuccessors) == Fail
+    for start in [(3, 3, 1, 0, 0, 0), (40, 20, 1, 0, 0, 0)]:
+        is_goal = lambda state: state == start[3:] + start[:3]
+        assert (parallel_shortest_path_search(start, csuccessors, is_goal, processes=2)
+                == shortest_path_search(start, csuccessors, is_goal))
+    return 'tests pass'
+
+if __name__ == '__main__':
+    print test()
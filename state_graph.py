@@ -0,0 +1,205 @@
+'''
+a problem's whole state space, as arrays, for answering many queries
+
+when the same small problem (missionaries and cannibals, a few glasses, a bridge with
+few people) is searched thousands of times, from different starts or for different
+goals, most of the time goes into calling successors on the same states again.
+StateGraph.build calls successors once for every state reachable from the start, and
+keeps the graph as compressed sparse row (CSR) arrays:
+
+    states: id -> state, and index: state -> id (ids are in breadth-first order)
+    indptr: the edges out of state i are indptr[i] to indptr[i+1] - 1
+    targets: the id of the state each edge leads to
+    actions: the id of each edge's action, in the table of distinct actions
+    costs: each edge's action_cost (only if an action_cost was given)
+
+shortest_path and lowest_cost_path then search the arrays, and never call successors;
+they return paths of the same length or cost, and in the same form, as
+shortest_path_search and lowest_cost_search.
+save writes the arrays to a directory as .npy files (and the state and action tables
+as a pickle), and load maps them back in without reading them, so a graph bigger than
+memory can still be queried
+
+    graph = StateGraph.build((3,3,1,0,0,0), csuccessors)
+    graph.save('mc.graph')
+    graph = StateGraph.load('mc.graph')
+    graph.shortest_path((3,3,1,0,0,0), [(0,0,0,3,3,1)])
+
+this needs numpy
+'''
+
+import heapq
+import os
+import cPickle as pickle
+import numpy as np
+from shortest_path_search import successor_pairs
+
+class StateGraph(object):
+    "the states reachable from a start, and the actions between them, as CSR arrays."
+
+    def __init__(self, states, actions, indptr, targets, action_ids, costs=None):
+        self.states = states
+        self.index = dict((state, i) for (i, state) in enumerate(states))
+        self.actions = actions
+        self.indptr = indptr
+        self.targets = targets
+        self.action_ids = action_ids
+        self.costs = costs
+
+    def __len__(self): return len(self.states)
+
+    @classmethod
+    def build(cls, start, successors, action_cost=None):
+        """expand every state reachable from start, in breadth-first order, and return
+        its graph.  if action_cost is given, each edge's cost is kept too."""
+        states, index = [start], {start: 0}
+        actions, action_index = [], {}
+        indptr, targets, action_ids, costs = [0], [], [], []
+        for state in states:  # states grows as we go: it is the queue, too
+            for (state2, action) in successor_pairs(successors(state)):
+                if state2 not in index:
+                    index[state2] = len(states)
+                    states.append(state2)
+                if action not in action_index:
+                    action_index[action] = len(actions)
+                    actions.append(action)
+                targets.append(index[state2])
+                action_ids.append(action_index[action])
+                if action_cost is not None:
+                    costs.append(action_cost(action))
+            indptr.append(len(targets))
+        return cls(states, actions, np.array(indptr, np.int64), np.array(targets, np.int32),
+                   np.array(action_ids, np.int32),
+                   np.array(costs) if action_cost is not None else None)
+
+    def save(self, directory):
+        "write the graph to directory (which is made if need be)."
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        for name in ('indptr', 'targets', 'action_ids', 'costs'):
+            if getattr(self, name) is not None:
+                np.save(os.path.join(directory, name + '.npy'), getattr(self, name))
+        with open(os.path.join(directory, 'tables.pickle'), 'wb') as f:
+            pickle.dump((self.states, self.actions), f, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """read a graph that save wrote to directory.  if mmap, the arrays are mapped
+        read-only from their files rather than read in."""
+        with open(os.path.join(directory, 'tables.pickle'), 'rb') as f:
+            states, actions = pickle.load(f)
+        def array(name):
+            filename = os.path.join(directory, name + '.npy')
+            if os.path.exists(filename):
+                return np.load(filename, mmap_mode='r' if mmap else None)
+        return cls(states, actions, array('indptr'), array('targets'), array('action_ids'),
+                   array('costs'))
+
+    def goal_mask(self, goals):
+        """a boolean array of which states are goals, where goals is either an
+        is_goal(state) function or a collection of goal states."""
+        mask = np.zeros(len(self.states), bool)
+        if callable(goals):
+            mask[:] = [goals(state) for state in self.states]
+        else:
+            mask[[self.index[goal] for goal in goals if goal in self.index]] = True
+        return mask
+
+    def shortest_path(self, start, goals):
+        """a shortest path from start to a goal (an is_goal function, a collection of
+        goal states, or a goal_mask), searching a layer at a time with array
+        operations.  where there are several, it may not be the one that
+        shortest_path_search finds."""
+        is_goal = goals if isinstance(goals, np.ndarray) else self.goal_mask(goals)
+        s = self.index[start]
+        if is_goal[s]:
+            return [start]
+        parent = np.full(len(self.states), -1, np.int64)  # id -> the edge we reached it by
+        reached = np.zeros(len(self.states), bool)
+        reached[s] = True
+        frontier = np.array([s], np.int64)
+        while frontier.size:
+            # the edges out of every state in the frontier, in order
+            first, counts = self.indptr[frontier], self.indptr[frontier + 1] - self.indptr[frontier]
+            edges = np.repeat(first - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+            states2 = self.targets[edges]
+            new = ~reached[states2]
+            edges, states2 = edges[new], states2[new]
+            # keep the first edge to each new state, in the order they were reached
+            _, firsts = np.unique(states2, return_index=True)
+            firsts.sort()
+            edges, frontier = edges[firsts], states2[firsts].astype(np.int64)
+            reached[frontier] = True
+            parent[frontier] = edges
+            goals_reached = np.flatnonzero(is_goal[frontier])
+            if goals_reached.size:
+                return self.build_path(parent, frontier[goals_reached[0]])
+        return []
+
+    def lowest_cost_path(self, start, goals):
+        """a lowest cost path from start to a goal (as in shortest_path), in the form
+        lowest_cost_search returns: [state, (action, total_cost), state, ...]."""
+        if self.costs is None:
+            raise ValueError('this graph was built without an action_cost')
+        is_goal = goals if isinstance(goals, np.ndarray) else self.goal_mask(goals)
+        s = self.index[start]
+        best = {s: 0}  # id -> lowest cost found so far
+        parent = {s: -1}  # id -> the edge we reached it by at that cost
+        frontier = [(0, s)]
+        explored = set()
+        indptr, targets, costs = self.indptr, self.targets, self.costs
+        while frontier:
+            cost, i = heapq.heappop(frontier)
+            if i in explored:
+                continue
+            if is_goal[i]:
+                return self.build_path(parent, i, best)
+            explored.add(i)
+            lo, hi = int(indptr[i]), int(indptr[i + 1])
+            for (edge, j, c) in zip(range(lo, hi), targets[lo:hi].tolist(), costs[lo:hi].tolist()):
+                if j not in explored and cost + c < best.get(j, float('inf')):
+                    best[j], parent[j] = cost + c, edge
+                    heapq.heappush(frontier, (cost + c, j))
+        return []
+
+    def build_path(self, parent, i, cost=None):
+        """follow parent edges back from state id i to the start; return the path.
+        if cost (id -> total cost) is given, actions are (action, total_cost) pairs."""
+        path = [self.states[i]]
+        while parent[i] != -1:
+            edge = int(parent[i])
+            action = self.actions[self.action_ids[edge]]
+            path.append(action if cost is None else (action, cost[i]))
+            i = int(np.searchsorted(self.indptr, edge, side='right')) - 1  # the edge's source
+            path.append(self.states[i])
+        path.reverse()
+        return path
+
+def test():
+    from cannibals_missionaries import csuccessors
+    from bridge_problem import bsuccessors2, all_over, bcost
+    from shortest_path_search import shortest_path_search
+    from lowest_cost_search import lowest_cost_search, path_cost
+    import shutil, tempfile
+    goal = (0, 0, 0, 3, 3, 1)
+    graph = StateGraph.build((3, 3, 1, 0, 0, 0), csuccessors)
+    directory = tempfile.mkdtemp()
+    try:
+        graph.save(directory)
+        graph = StateGraph.load(directory)
+    finally:
+        shutil.rmtree(directory)
+    for start in graph.states:
+        path = graph.shortest_path(start, [goal])
+        assert len(path) == len(shortest_path_search(start, csuccessors, lambda state: state == goal))
+        assert all(csuccessors(path[i])[path[i+2]] == path[i+1] for i in range(0, len(path) - 2, 2))
+    start = (frozenset([1, 2, 5, 10, 'light']), frozenset())
+    graph = StateGraph.build(start, bsuccessors2, bcost)
+    assert path_cost(graph.lowest_cost_path(start, all_over)) == 17
+    assert all(path_cost(graph.lowest_cost_path(state, all_over)) ==
+               path_cost(lowest_cost_search(state, bsuccessors2, all_over, bcost))
+               for state in graph.states)
+    return 'test passes'
+
+if __name__ == '__main__':
+    print test()
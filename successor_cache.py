@@ -0,0 +1,101 @@
+'''
+a bounded cache for successor functions
+
+some successors functions are expensive (bsuccessors builds a frozenset for every pair
+of people, every time a state is expanded), and a batch of searches over the same or
+overlapping problems expands many of the same states again.  wrapping successors in a
+SuccessorCache remembers the {state: action} dict for the states expanded most recently,
+up to a cap on the number of (state, action) pairs held in all, and drops the least
+recently used states first when it is full.  it can be passed to any search in place of
+the function it wraps, and kept between searches:
+
+    successors = SuccessorCache(bsuccessors2, max_successors=10**6)
+    for here in batch:
+        lowest_cost_search((here, frozenset()), successors, all_over, bcost)
+    successors.hits, successors.misses
+
+the cap should hold the pairs of the states one search expands: with a smaller one
+(say, 50 pairs for a bridge problem), each state is dropped before the next search
+reaches it again, and there are no hits at all.
+
+the dicts it returns are shared between calls, so searches must not change them (none
+of ours do).  a successors function that yields (state, action) pairs lazily gets no
+benefit from being lazy here: its pairs are all made, and kept as a list, the first
+time a state is expanded
+'''
+
+from collections import OrderedDict
+
+class SuccessorCache(object):
+    """successors(state) => {state: action, ...}, remembered for recently expanded
+    states; the cache holds at most max_successors (state, action) pairs in all."""
+
+    def __init__(self, successors, max_successors=10**6):
+        self.successors = successors
+        self.max_successors = max_successors
+        self.cache = OrderedDict()  # state -> successors(state), least recently used first
+        self.size = 0  # number of (state, action) pairs in the cache
+        self.hits = self.misses = self.evictions = 0
+
+    def __call__(self, state):
+        try:
+            result = self.cache.pop(state)
+        except KeyError:
+            self.misses += 1
+            result = self.successors(state)
+            if not isinstance(result, dict):
+                result = list(result)  # a generator of pairs can only be read once
+            if len(result) > self.max_successors:  # too big to keep at all
+                return result  # (and the states that are kept stay kept)
+            self.size += len(result)
+            while self.size > self.max_successors:
+                (old, dropped) = self.cache.popitem(last=False)
+                self.size -= len(dropped)
+                self.evictions += 1
+        else:
+            self.hits += 1
+        self.cache[state] = result  # (re)insert as the most recently used
+        return result
+
+    def stats(self):
+        "return a dict of hit, miss and eviction counts, and the number of states and pairs held."
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'states': len(self.cache), 'successors': self.size}
+
+    def clear(self):
+        "empty the cache (the counts are kept)."
+        self.cache.clear()
+        self.size = 0
+
+def test():
+    from lowest_cost_search import lowest_cost_search
+    from bridge_problem import bsuccessors2, all_over, bcost
+    calls = []
+    def successors(n):
+        "n's successors are the n numbers after it"
+        calls.append(n)
+        return dict((n + i, i) for i in range(1, n + 1))
+    cache = SuccessorCache(successors, max_successors=5)
+    assert cache(2) == {3: 1, 4: 2} and cache(3) == {4: 1, 5: 2, 6: 3} and cache.size == 5
+    assert cache(2) is cache(2) and calls == [2, 3] and (cache.hits, cache.misses) == (2, 2)
+    cache(1)  # 6 pairs: 3, the least recently used, is dropped; 2 is kept
+    assert list(cache.cache) == [2, 1] and cache.size == 3 and cache.evictions == 1
+    cache(3)  # 3 is expanded again, and 2 is dropped to make room
+    assert list(cache.cache) == [1, 3] and cache.size == 4 and calls == [2, 3, 1, 3]
+    assert cache(9) == successors(9) and 9 not in cache.cache  # too big to keep, so nothing is dropped
+    assert list(cache.cache) == [1, 3] and cache.size == 4 and cache.evictions == 2
+    cache.clear()
+    assert cache.stats() == {'hits': 2, 'misses': 5, 'evictions': 2, 'states': 0, 'successors': 0}
+    assert list(SuccessorCache(lambda n: iter([(n + 1, 1)]))(1)) == [(2, 1)]
+    # a batch in which the same problem comes up twice is served from the cache the second time
+    batch = [frozenset([1, 2, 5, 10, 'light']), frozenset([1, 2, 5, 10, 15, 'light']),
+             frozenset([1, 2, 5, 10, 'light'])]
+    cache = SuccessorCache(bsuccessors2)
+    for here in batch:
+        path = lowest_cost_search((here, frozenset()), cache, all_over, bcost)
+        assert path == lowest_cost_search((here, frozenset()), bsuccessors2, all_over, bcost)
+    assert cache.hits > 0 and cache.evictions == 0
+    return 'tests pass'
+
+if __name__ == '__main__':
+    print test()
@@ -0,0 +1,99 @@
+'''
+breadth-first search a layer at a time, with numpy arrays
+
+when states are short tuples of small ints (the glass levels of the pouring problems,
+the missionaries, cannibals and boats of mc_problem), a whole layer of the frontier can
+be held as one (n, k) array, and expanded, checked for goals and stripped of duplicates
+with array operations instead of a python loop over its states.  the problem supplies
+successors and is_goal that work on such arrays:
+
+    successors(states) -> (next_states, valid): for n states and a actions, next_states
+        is an (n, a, k) array of the state each action leads to, and valid an (n, a)
+        boolean array of which actions can be taken
+    is_goal(states) -> an (n,) boolean array
+
+each state is encoded as one int64 (the digits of a mixed-radix number, given the most
+each of its numbers can be), and the explored states are kept as a sorted array of these
+codes, so a layer's duplicates are found by sorting and binary search.  the path comes
+back as a [state, action, state, ...] list of tuples and action names, as from
+shortest_path_search
+
+this needs numpy
+'''
+
+import numpy as np
+
+def vector_shortest_path_search(start, successors, is_goal, bounds, actions, stats=None):
+    """Find a shortest path from start to a state for which is_goal is true, expanding
+    a layer at a time.  bounds[i] is the most the i-th number in a state can be, and
+    actions[j] is the action that makes next_states[:, j] (see above).  stats, if
+    given, is a search_stats.SearchStats; it counts states expanded and generated, but
+    times only the whole search."""
+    radix = np.array(bounds, np.int64) + 1
+    if np.prod(radix.astype(float)) >= 2**63:
+        raise ValueError('states with bounds %s are too big to encode in an int64' % (bounds,))
+    weights = np.append(np.cumprod(radix[::-1])[::-1][1:], 1)  # place value of each number
+    frontier = np.array([start], np.int64)
+    if is_goal(frontier)[0]:
+        return stats.done([start]) if stats else [start]
+    explored = frontier.dot(weights)  # sorted codes of every state reached
+    layers = []  # (states, index of each one's parent in the layer before, action index)
+    while len(frontier):
+        next_states, valid = successors(frontier)
+        parents, moves = np.nonzero(valid)  # in order of parent, then action, as a loop would
+        states = next_states[parents, moves]
+        codes = states.dot(weights)
+        # keep the first of each state that is new, in the order reached
+        _, first = np.unique(codes, return_index=True)
+        first.sort()
+        where = np.searchsorted(explored, codes[first])
+        new = first[(where == len(explored)) |
+                    (explored[np.minimum(where, len(explored) - 1)] != codes[first])]
+        if stats is not None:
+            stats.expanded += len(frontier)
+            stats.generated += len(codes)
+            stats.duplicates += len(codes) - len(new)
+        frontier, parents, moves = states[new], parents[new], moves[new]
+        layers.append((frontier, parents, moves))
+        sorted_codes = np.sort(codes[new])
+        explored = np.insert(explored, np.searchsorted(explored, sorted_codes), sorted_codes)
+        if stats is not None:
+            stats.sizes(len(frontier), len(explored))
+        goals = np.flatnonzero(is_goal(frontier)) if len(frontier) else []
+        if len(goals):
+            path = build_path(start, layers, goals[0], actions)
+            return stats.done(path) if stats else path
+    return stats.done(Fail) if stats else Fail
+
+def build_path(start, layers, i, actions):
+    "Follow parent indices back from state i of the last layer; return the path."
+    path = []
+    for (states, parents, moves) in reversed(layers):
+        path += [tuple(int(n) for n in states[i]), actions[moves[i]]]
+        i = parents[i]
+    path.append(start)
+    path.reverse()
+    return path
+
+Fail = []
+
+def test():
+    import cannibals_missionaries as mc
+    import pouring_water as pw
+    for start in [(3,3,1,0,0,0), (5,3,1,0,0,0), (4,4,1,0,0,0), (40,20,1,0,0,0)]:
+        path = mc.mc_problem_vector(start)
+        assert len(path) == len(mc.mc_problem(start))
+        assert all(mc.csuccessors(path[i])[path[i+2]] == path[i+1] for i in range(0, len(path) - 2, 2))
+    assert mc.mc_problem_vector((4,4,1,0,0,0)) == []
+    for capacities in [(1, 2, 4, 8), (3, 3, 5, 5), (8, 12, 16, 20, 24)]:
+        for goal in range(max(capacities) + 2):
+            path = pw.more_pour_problem_vector(capacities, goal)
+            assert len(path) == len(pw.more_pour_problem(capacities, goal))
+            assert all(pw.more_pour_successors(path[i], capacities)[path[i+2]]
+                       for i in range(0, len(path) - 2, 2))
+    assert pw.more_pour_problem_vector((1, 2, 4), 3) == [
+        (0, 0, 0), ('fill', 2), (0, 0, 4), ('pour', 2, 0), (1, 0, 3)]
+    return 'test passes'
+
+if __name__ == '__main__':
+    print test()